@@ -0,0 +1,69 @@
+"""add instruments
+
+Revision ID: 3c1f9e2a7b54
+Revises: 7097bc3689bd
+Create Date: 2026-10-19 10:12:41.518302
+
+"""
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9e2a7b54'
+down_revision: Union[str, Sequence[str], None] = '7097bc3689bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The universe that used to be hard-coded in market/engine.py and routes/trading.py
+SEED = [
+    ("AAPL", Decimal("185.00"), Decimal("0.0020")),
+    ("MSFT", Decimal("410.00"), Decimal("0.0018")),
+    ("TSLA", Decimal("240.00"), Decimal("0.0060")),
+    ("AMZN", Decimal("170.00"), Decimal("0.0025")),
+    ("GOOGL", Decimal("145.00"), Decimal("0.0022")),
+    ("NVDA", Decimal("600.00"), Decimal("0.0050")),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    instruments = op.create_table('instruments',
+    sa.Column('symbol', sa.String(length=16), nullable=False),
+    sa.Column('start_price', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.Column('volatility', sa.Numeric(precision=8, scale=6), nullable=False),
+    sa.Column('tick_size', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('symbol')
+    )
+    op.bulk_insert(instruments, [
+        {"symbol": s, "start_price": p, "volatility": v, "tick_size": Decimal("0.0001"), "active": True}
+        for s, p, v in SEED
+    ])
+
+    # Hot reload: every process holding an InstrumentRegistry LISTENs on this channel
+    op.execute("""
+        CREATE FUNCTION notify_instruments_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('instruments_changed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER instruments_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON instruments
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_instruments_changed()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS instruments_changed ON instruments")
+    op.execute("DROP FUNCTION IF EXISTS notify_instruments_changed()")
+    op.drop_table('instruments')
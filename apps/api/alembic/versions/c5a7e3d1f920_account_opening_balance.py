@@ -0,0 +1,44 @@
+"""account opening balance
+
+Revision ID: c5a7e3d1f920
+Revises: 8df1fe2ba997
+Create Date: 2026-10-19 21:14:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a7e3d1f920'
+down_revision: Union[str, Sequence[str], None] = '8df1fe2ba997'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('accounts', sa.Column('opening_balance', sa.Numeric(precision=16, scale=4), nullable=True))
+    # An account that never sold still holds its opening book value (cash +
+    # cost basis) exactly; for the others it can't be recovered, so they keep
+    # the old global STARTING_CASH baseline.
+    op.execute("""
+        UPDATE accounts a
+        SET opening_balance = CASE
+            WHEN EXISTS (
+                SELECT 1 FROM orders o
+                WHERE o.user_id = a.user_id AND o.side = 'sell' AND o.status = 'filled'
+            ) THEN 10000.00
+            ELSE a.cash_balance + coalesce(
+                (SELECT sum(p.qty * p.avg_price) FROM positions p WHERE p.user_id = a.user_id), 0
+            )
+        END
+    """)
+    op.alter_column('accounts', 'opening_balance', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('accounts', 'opening_balance')
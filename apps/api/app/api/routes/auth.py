@@ -4,14 +4,17 @@ from sqlalchemy import select
 
 from app.core.database import get_db
 from app.core.security import hash_password, verify_password, create_access_token
+from app.core.querybudget import query_budget
 from app.models.user import User
 from app.models.account import Account
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
+from app.services.accounting import STARTING_CASH
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=TokenResponse, status_code=201)
+@query_budget(3)
 def register(payload: RegisterRequest, db: Session = Depends(get_db)):
 
     existing = db.scalar(select(User).where(User.email == payload.email))
@@ -27,16 +30,19 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
 
     account = Account(
         user_id=user.id,
-        cash_balance=10000.00,
+        cash_balance=STARTING_CASH,
+        opening_balance=STARTING_CASH,
     )
     db.add(account)
+    user_id = user.id  # read before commit expires it, saves a reload
     db.commit()
 
-    token = create_access_token(str(user.id))
+    token = create_access_token(str(user_id))
     return TokenResponse(access_token=token)
 
 
 @router.post("/login", response_model=TokenResponse)
+@query_budget(1)
 def login(payload: LoginRequest, db: Session = Depends(get_db)):
     user = db.scalar(select(User).where(User.email == payload.email))
     if not user or not verify_password(payload.password, user.password_hash):
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.database import ReadSessionLocal
+from app.core.security import get_current_user_id
+from app.core.querybudget import query_budget
+from app.services.export import (
+    MEDIA_TYPES,
+    ORDER_COLUMNS,
+    TICK_COLUMNS,
+    ExportFormat,
+    ExportUnavailable,
+    archived_ticks,
+    iter_export,
+    order_query,
+    tick_query,
+)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _stream(name: str, body, fmt: ExportFormat) -> StreamingResponse:
+    ext = {"csv": "csv", "arrow": "arrows", "parquet": "parquet"}[fmt]
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{ext}"'},
+    )
+
+
+@router.get("/ticks")
+@query_budget(1)
+def export_ticks(
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    format: ExportFormat = "csv",
+    user_id: str = Depends(get_current_user_id),
+):
+    stmt = tick_query(symbol, since, until)
+    try:
+        body = iter_export(
+            ReadSessionLocal, stmt, TICK_COLUMNS, format, head=archived_ticks(symbol, since, until)
+        )
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return _stream(f"ticks-{symbol.upper()}" if symbol else "ticks", body, format)
+
+
+@router.get("/orders")
+@query_budget(1)
+def export_orders(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    format: ExportFormat = "csv",
+    user_id: str = Depends(get_current_user_id),
+):
+    stmt = order_query(int(user_id), since, until)
+    try:
+        body = iter_export(ReadSessionLocal, stmt, ORDER_COLUMNS, format)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return _stream("orders", body, format)
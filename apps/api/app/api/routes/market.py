@@ -1,23 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import select, desc
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.money import ticks_to_float
+from app.core.querybudget import query_budget
+from app.market.archive import tick_archive
+from app.market.downsample import minmax
+from app.market.history import range_minmax
+from app.market.tickbuffer import tick_store
 from app.models.market_price import MarketPrice
 from app.models.market_tick import MarketTick
+from app.services.quotes import live_quote
 
 router = APIRouter(prefix="/market", tags=["market"])
 
+# Upper bound for ?points=, keeps chart payloads small whatever the range
+MAX_POINTS = 5000
+# Upper bound for ?limit=, so one request can't turn into an unbounded scan
+MAX_LIMIT = 10_000
+
 
 @router.get("/symbols")
-def symbols(db: Session = Depends(get_db)):
+@query_budget(1)
+def symbols(db: Session = Depends(get_read_db)):
     rows = db.execute(select(MarketPrice.symbol).order_by(MarketPrice.symbol)).all()
     return [r[0] for r in rows]
 
 
 @router.get("/quote/{symbol}")
-def quote(symbol: str, db: Session = Depends(get_db)):
+@query_budget(1)
+def quote(symbol: str, db: Session = Depends(get_read_db)):
     symbol = symbol.upper()
+    live = live_quote(symbol)
+    if live is not None:
+        return {"symbol": symbol, "price": ticks_to_float(live[0]), "updated_at": live[1]}
+
     mp = db.get(MarketPrice, symbol)
     if not mp:
         raise HTTPException(status_code=404, detail="Unknown symbol")
@@ -30,19 +52,50 @@ def quote(symbol: str, db: Session = Depends(get_db)):
 
 
 @router.get("/history/{symbol}")
-def history(symbol: str, limit: int = 60, db: Session = Depends(get_db)):
+@query_budget(1)
+def history(
+    symbol: str,
+    limit: int = Query(60, ge=1, le=MAX_LIMIT),
+    points: Optional[int] = Query(None, ge=2, le=MAX_POINTS),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Prices oldest -> newest.
+
+    Without since/until: the latest `limit` ticks. With a range: the latest
+    `limit` ticks inside it. `points` downsamples (min/max per bucket) to at
+    most that many values; with a range it covers the whole range in equal
+    time buckets, computed in SQL, and ignores `limit`; without one it
+    covers just the latest `limit` ticks.
+    """
     symbol = symbol.upper()
+    ranged = since is not None or until is not None
+
+    if ranged and points is not None:
+        return range_minmax(db, symbol, since, until, points)
 
-    rows = (
-        db.execute(
-            select(MarketTick.price)
-            .where(MarketTick.symbol == symbol)
-            .order_by(desc(MarketTick.ts))
-            .limit(limit)
+    cached = None if ranged else tick_store.history(symbol, limit)
+    if cached is None:
+        boundary = tick_archive.split(symbol, since)
+        stmt = select(MarketTick.price).where(MarketTick.symbol == symbol)
+        lower = boundary or since  # older rows come from the archive
+        if lower is not None:
+            stmt = stmt.where(MarketTick.ts >= lower)
+        if until is not None:
+            stmt = stmt.where(MarketTick.ts < until)
+        rows = (
+            db.execute(stmt.order_by(desc(MarketTick.ts), desc(MarketTick.id)).limit(limit))
+            .scalars()
+            .all()
         )
-        .scalars()
-        .all()
-    )
+        # oldest -> newest for chart/sparkline
+        cached = [float(p) for p in reversed(rows)]
+        if boundary is not None and len(cached) < limit:
+            older = tick_archive.tail(symbol, limit - len(cached), since=since, until=until)
+            cached = older.tolist() + cached
 
-    # oldest -> newest for chart/sparkline
-    return [float(p) for p in reversed(rows)]
+    if points is not None:
+        return minmax(np.asarray(cached, dtype=np.float64), points).tolist()
+    return cached
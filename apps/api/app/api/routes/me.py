@@ -2,15 +2,17 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_user_read_db
 from app.core.security import get_current_user_id
+from app.core.querybudget import query_budget
 from app.models.account import Account
 
 router = APIRouter(prefix="/me", tags=["me"])
 
 @router.get("/account")
+@query_budget(1)
 def my_account(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_read_db),
     user_id: str = Depends(get_current_user_id),
 ):
     acct = db.scalar(select(Account).where(Account.user_id == int(user_id)))
@@ -1,39 +1,64 @@
-from decimal import Decimal, ROUND_HALF_UP
 import logging
-from typing import Final
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_user_read_db, get_user_write_db, pin_to_primary
+from app.core.money import PRICE_SCALE, TICKS_PER_CENT, cents_to_float, ticks_to_float, to_cents, to_ticks
 from app.core.security import get_current_user_id
+from app.core.config import settings
+from app.core.querybudget import query_budget
+from app.core.ratelimit import rate_limit
 from app.models.account import Account
 from app.models.order import Order
 from app.models.position import Position
 from app.schemas.trading import OrderCreate, OrderOut, PositionOut
-from app.schemas.portfolio import PortfolioSummary, PositionWithQuote
-from app.services.quotes import get_quote
+from app.schemas.portfolio import PortfolioSummary, PositionWithQuote, RiskSummary
+from app.services.accounting import OrderRejected
+from app.services import state_versions
+from app.services.instruments import instruments
+from app.services.orders import AccountNotFound, execute_order
+from app.services.quotes import get_quotes
+from app.services.risk import portfolio_risk
+from app.services.sequencer import SequencerUnavailable, sequencer
 
 
 router = APIRouter(prefix="/trading", tags=["trading"])
 logger = logging.getLogger(__name__)
 
-# ✅ Must match market/engine.py SYMBOLS
-VALID_SYMBOLS: Final[set[str]] = {
-    "AAPL",
-    "MSFT",
-    "TSLA",
-    "AMZN",
-    "GOOGL",
-    "NVDA",
-}
+orders_limit = Depends(
+    rate_limit("orders", settings.RATE_LIMIT_ORDERS_PER_SEC, settings.RATE_LIMIT_ORDERS_BURST)
+)
+portfolio_limit = Depends(
+    rate_limit("portfolio", settings.RATE_LIMIT_PORTFOLIO_PER_SEC, settings.RATE_LIMIT_PORTFOLIO_BURST)
+)
+risk_limit = Depends(
+    rate_limit("risk", settings.RATE_LIMIT_PORTFOLIO_PER_SEC, settings.RATE_LIMIT_PORTFOLIO_BURST)
+)
 
 
-@router.post("/orders", response_model=OrderOut, status_code=201)
+def reads_limit(name: str):
+    return Depends(rate_limit(name, settings.RATE_LIMIT_READS_PER_SEC, settings.RATE_LIMIT_READS_BURST))
+
+
+def _commit_user_change(db: Session, uid: int) -> None:
+    state_versions.notify_changed(db, uid)
+    db.commit()
+    # Before the response goes out, so the client's next read sees the write
+    pin_to_primary(uid)
+    state_versions.bump(uid)
+
+
+@router.post("/orders", response_model=OrderOut, status_code=201, dependencies=[orders_limit])
+# 7 committing directly; 8 through the sequencer, whose savepoint pair is the
+# request's own while the batch's notify and commit are shared
+@query_budget(8)
 def place_order(
     payload: OrderCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_write_db),
     user_id: str = Depends(get_current_user_id),
 ):
     uid = int(user_id)
@@ -47,11 +72,10 @@ def place_order(
     if not symbol:
         raise HTTPException(status_code=400, detail="Symbol is required")
 
-    if symbol not in VALID_SYMBOLS:
-        allowed = ", ".join(sorted(VALID_SYMBOLS))
+    if not instruments.is_active(symbol):
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported symbol '{symbol}'. Allowed: {allowed}",
+            detail=f"Unsupported symbol '{symbol}'. See /market/symbols",
         )
 
     if side not in ("buy", "sell"):
@@ -61,143 +85,49 @@ def place_order(
         raise HTTPException(status_code=400, detail="Quantity must be >= 1")
     # =========================
 
-    # Decimal money math (price comes from synthetic market via DB)
     try:
-        price = get_quote(db, symbol).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+        if settings.ORDER_SEQUENCER_ENABLED:
+            try:
+                return sequencer.submit(uid, symbol, side, qty).result(
+                    timeout=settings.ORDER_SEQUENCER_TIMEOUT_SECONDS
+                )
+            except SequencerUnavailable as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            except FutureTimeout:
+                # Still queued: it may yet fill, so the client must check before retrying
+                raise HTTPException(
+                    status_code=503,
+                    detail="order not confirmed in time; check /trading/orders before retrying",
+                )
+        try:
+            out = execute_order(db, uid, symbol, side, qty)
+        except OrderRejected:
+            _commit_user_change(db, uid)  # the rejected order is still recorded
+            raise
+        _commit_user_change(db, uid)
+        return out
+    except OrderRejected as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except AccountNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         # If symbol is valid but market hasn't seeded it yet
         raise HTTPException(status_code=400, detail=str(e))
 
-    notional = (price * Decimal(qty)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-    account = db.scalar(select(Account).where(Account.user_id == uid))
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-
-    position = db.scalar(
-        select(Position).where(Position.user_id == uid, Position.symbol == symbol)
-    )
-
-    # =========================
-    # BUY
-    # =========================
-    if side == "buy":
-        # account.cash_balance is Numeric -> Decimal at runtime
-        if Decimal(account.cash_balance) < notional:
-            order = Order(
-                user_id=uid,
-                symbol=symbol,
-                side=side,
-                qty=qty,
-                status="rejected",
-                filled_price=None,
-            )
-            db.add(order)
-            db.commit()
-            raise HTTPException(status_code=400, detail="Insufficient cash")
-
-        account.cash_balance = (Decimal(account.cash_balance) - notional).quantize(
-            Decimal("0.01"), rounding=ROUND_HALF_UP
-        )
-
-        if position is None:
-            position = Position(
-                user_id=uid,
-                symbol=symbol,
-                qty=qty,
-                avg_price=price,
-            )
-            db.add(position)
-        else:
-            old_qty = int(position.qty)
-            new_qty = old_qty + qty
-
-            old_cost = Decimal(position.avg_price) * Decimal(old_qty)
-            new_cost = old_cost + notional
-
-            position.qty = new_qty
-            position.avg_price = (new_cost / Decimal(new_qty)).quantize(
-                Decimal("0.0001"), rounding=ROUND_HALF_UP
-            )
-
-        order = Order(
-            user_id=uid,
-            symbol=symbol,
-            side=side,
-            qty=qty,
-            status="filled",
-            filled_price=price,
-        )
-        db.add(order)
-        db.commit()
-        db.refresh(order)
-
-        return OrderOut(
-            id=order.id,
-            symbol=order.symbol,
-            side=order.side,
-            qty=order.qty,
-            status=order.status,
-            filled_price=float(order.filled_price),
-        )
-
-    # =========================
-    # SELL
-    # =========================
-    held = int(position.qty) if position is not None else 0
-    if held < qty:
-        order = Order(
-            user_id=uid,
-            symbol=symbol,
-            side=side,
-            qty=qty,
-            status="rejected",
-            filled_price=None,
-        )
-        db.add(order)
-        db.commit()
-        raise HTTPException(
-            status_code=400,
-            detail=f"Insufficient shares (have {held}, tried to sell {qty})",
-        )
-
-    account.cash_balance = (Decimal(account.cash_balance) + notional).quantize(
-        Decimal("0.01"), rounding=ROUND_HALF_UP
-    )
-
-    # position must exist here because held >= qty and qty > 0
-    position.qty = held - qty
-    if position.qty == 0:
-        db.delete(position)
-
-    order = Order(
-        user_id=uid,
-        symbol=symbol,
-        side=side,
-        qty=qty,
-        status="filled",
-        filled_price=price,
-    )
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    return OrderOut(
-        id=order.id,
-        symbol=order.symbol,
-        side=order.side,
-        qty=order.qty,
-        status=order.status,
-        filled_price=float(order.filled_price),
-    )
-
 
-@router.get("/positions", response_model=list[PositionOut])
+@router.get("/positions", response_model=list[PositionOut], dependencies=[reads_limit("positions")])
+@query_budget(1)
 def list_positions(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_user_read_db),
     user_id: str = Depends(get_current_user_id),
 ):
     uid = int(user_id)
+    cached = state_versions.not_modified(request, response, uid)
+    if cached is not None:
+        return cached
+
     positions = db.scalars(
         select(Position).where(Position.user_id == uid).order_by(Position.symbol)
     ).all()
@@ -208,12 +138,19 @@ def list_positions(
     ]
 
 
-@router.get("/orders", response_model=list[OrderOut])
+@router.get("/orders", response_model=list[OrderOut], dependencies=[reads_limit("order_history")])
+@query_budget(1)
 def list_orders(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_user_read_db),
     user_id: str = Depends(get_current_user_id),
 ):
     uid = int(user_id)
+    cached = state_versions.not_modified(request, response, uid)
+    if cached is not None:
+        return cached
+
     return db.scalars(
         select(Order)
         .where(Order.user_id == uid)
@@ -221,21 +158,29 @@ def list_orders(
     ).all()
 
 
-@router.get("/account")
+@router.get("/account", dependencies=[reads_limit("account")])
+@query_budget(1)
 def get_account(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_user_read_db),
     user_id: str = Depends(get_current_user_id),
 ):
     uid = int(user_id)
+    cached = state_versions.not_modified(request, response, uid)
+    if cached is not None:
+        return cached
+
     account = db.scalar(select(Account).where(Account.user_id == uid))
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return {"cash_balance": float(account.cash_balance)}
 
 
-@router.get("/portfolio", response_model=PortfolioSummary)
+@router.get("/portfolio", response_model=PortfolioSummary, dependencies=[portfolio_limit])
+@query_budget(3)
 def get_portfolio(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_read_db),
     user_id: str = Depends(get_current_user_id),
 ):
     uid = int(user_id)
@@ -245,21 +190,20 @@ def get_portfolio(
         raise HTTPException(status_code=404, detail="Account not found")
 
     positions = db.scalars(select(Position).where(Position.user_id == uid)).all()
+    quotes = get_quotes(db, [p.symbol for p in positions])
 
+    # Valuation is exact in 0.0001 units (ticks * shares); floats only at the end
     pos_out: list[PositionWithQuote] = []
-    positions_value = 0.0
-    unrealized_total = 0.0
+    positions_value = 0
+    unrealized_total = 0
 
     for p in positions:
-        try:
-            price = float(get_quote(db, p.symbol))
-        except ValueError:
-            # If a position exists for a symbol that isn't in market_prices yet,
-            # treat last price as 0.0 (safer than crashing the endpoint)
-            price = 0.0
+        # If a position exists for a symbol that isn't in market_prices yet,
+        # treat last price as 0.0 (safer than crashing the endpoint)
+        price = quotes.get(p.symbol, 0)
 
         qty = int(p.qty)
-        avg = float(p.avg_price)
+        avg = to_ticks(p.avg_price)
 
         cost_basis = qty * avg
         market_value = qty * price
@@ -274,22 +218,66 @@ def get_portfolio(
             PositionWithQuote(
                 symbol=p.symbol,
                 qty=qty,
-                avg_price=avg,
-                last_price=price,
-                market_value=market_value,
-                cost_basis=cost_basis,
-                unrealized_pnl=unrealized,
+                avg_price=ticks_to_float(avg),
+                last_price=ticks_to_float(price),
+                market_value=market_value / PRICE_SCALE,
+                cost_basis=cost_basis / PRICE_SCALE,
+                unrealized_pnl=unrealized / PRICE_SCALE,
                 unrealized_pnl_pct=pct,
             )
         )
 
-    cash = float(account.cash_balance)
-    equity = cash + positions_value
+    cash = to_cents(account.cash_balance)
+    equity = cash * TICKS_PER_CENT + positions_value
 
     return PortfolioSummary(
-        cash=cash,
-        equity=equity,
-        positions_value=positions_value,
-        unrealized_pnl=unrealized_total,
+        cash=cents_to_float(cash),
+        equity=equity / PRICE_SCALE,
+        positions_value=positions_value / PRICE_SCALE,
+        unrealized_pnl=unrealized_total / PRICE_SCALE,
         positions=pos_out,
     )
+
+
+@router.get("/risk", response_model=RiskSummary, dependencies=[risk_limit])
+@query_budget(3)
+def get_risk(
+    confidence: float = Query(0.95, gt=0.5, lt=1.0),
+    window: Optional[int] = Query(
+        None,
+        ge=2,
+        le=settings.TICK_BUFFER_SIZE - 1,
+        description="Most recent tick returns to use (default and maximum: max_window)",
+    ),
+    db: Session = Depends(get_user_read_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Per-tick VaR/CVaR, volatility and correlation of the open positions.
+
+    History comes from the in-memory tick buffers only: at most
+    TICK_BUFFER_SIZE - 1 returns per symbol (511, about 17 minutes at the
+    default 2 s tick), reported as `max_window`.
+    """
+    uid = int(user_id)
+
+    account = db.scalar(select(Account).where(Account.user_id == uid))
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    positions = db.scalars(select(Position).where(Position.user_id == uid)).all()
+    quotes = get_quotes(db, [p.symbol for p in positions])
+
+    exposures: dict[str, float] = {}
+    value = 0
+    for p in positions:
+        mv = int(p.qty) * quotes.get(p.symbol, 0)
+        value += mv
+        exposures[p.symbol] = mv / PRICE_SCALE
+    equity = (to_cents(account.cash_balance) * TICKS_PER_CENT + value) / PRICE_SCALE
+
+    return RiskSummary(
+        equity=equity,
+        max_window=settings.TICK_BUFFER_SIZE - 1,
+        **portfolio_risk(exposures, confidence, window),
+    )
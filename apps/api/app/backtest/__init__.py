@@ -0,0 +1,2 @@
+from .data import PriceSeries, load_ticks
+from .engine import BacktestResult, param_grid, run_backtest, run_grid
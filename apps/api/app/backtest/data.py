@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.market.archive import as_utc, tick_archive
+from app.models.market_tick import MarketTick
+
+CHUNK_ROWS = 100_000
+
+
+@dataclass(frozen=True)
+class PriceSeries:
+    symbol: str
+    ts: np.ndarray  # float64 epoch seconds, ascending
+    price: np.ndarray  # float64
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+
+def load_ticks(
+    db: Session,
+    symbols: Iterable[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict[str, PriceSeries]:
+    """
+    Load ticks into one pair of columnar arrays per symbol: archived days
+    (app.market.archive) first, then the hot rows still in market_ticks.
+    """
+    out: dict[str, PriceSeries] = {}
+    for symbol in symbols:
+        symbol = symbol.upper()
+        ts_parts: list[np.ndarray] = []
+        price_parts: list[np.ndarray] = []
+
+        since_db = since
+        boundary = tick_archive.split(symbol, since)
+        if boundary is not None:
+            for ts, price in tick_archive.segments(symbol, since, until):
+                ts_parts.append(ts)
+                price_parts.append(price)
+            # Rows before the boundary are archived (or about to be deleted)
+            since_db = boundary
+
+        stmt = (
+            select(MarketTick.ts, MarketTick.price)
+            .where(MarketTick.symbol == symbol)
+            .order_by(MarketTick.ts, MarketTick.id)
+        )
+        if since_db is not None:
+            stmt = stmt.where(MarketTick.ts >= since_db)
+        if until is not None:
+            stmt = stmt.where(MarketTick.ts < until)
+
+        if until is None or since_db is None or as_utc(since_db) < as_utc(until):  # else fully archived
+            result = db.execute(stmt.execution_options(yield_per=CHUNK_ROWS))
+            for rows in result.partitions():
+                ts_parts.append(np.fromiter((r[0].timestamp() for r in rows), np.float64, len(rows)))
+                price_parts.append(np.fromiter((r[1] for r in rows), np.float64, len(rows)))
+
+        if len(ts_parts) == 1:
+            ts_col, price_col = ts_parts[0], price_parts[0]  # keep an archive view uncopied
+        elif ts_parts:
+            ts_col, price_col = np.concatenate(ts_parts), np.concatenate(price_parts)
+        else:
+            ts_col = price_col = np.empty(0, np.float64)
+        out[symbol] = PriceSeries(symbol=symbol, ts=ts_col, price=price_col)
+    return out
@@ -0,0 +1,181 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import numpy as np
+
+from app.backtest.data import PriceSeries
+from app.core.money import cents_to_float, float_to_ticks, to_cents
+from app.services.accounting import STARTING_CASH, OrderRejected, apply_buy, apply_sell
+
+Strategy = Callable[..., np.ndarray]
+
+
+@dataclass
+class BacktestResult:
+    params: dict[str, Any]
+    starting_cash: float
+    final_cash: float
+    final_equity: float
+    total_return: float
+    max_drawdown: float
+    fills: int
+    rejected: int
+    positions: dict[str, int] = field(default_factory=dict)
+    equity_ts: Optional[np.ndarray] = None
+    equity: Optional[np.ndarray] = None
+
+
+def run_backtest(
+    series: Mapping[str, PriceSeries],
+    strategy: Strategy,
+    params: Optional[Mapping[str, Any]] = None,
+    starting_cash: Decimal = STARTING_CASH,
+    keep_curve: bool = True,
+) -> BacktestResult:
+    params = dict(params or {})
+
+    # 1) Vectorized signals, one pass per symbol
+    ev_ts, ev_sym, ev_idx, ev_qty = [], [], [], []
+    symbols = list(series)
+    for k, sym in enumerate(symbols):
+        s = series[sym]
+        if len(s) == 0:
+            continue
+        orders = np.asarray(strategy(s.price, **params), dtype=np.int64)
+        nz = np.flatnonzero(orders)
+        ev_ts.append(s.ts[nz])
+        ev_sym.append(np.full(len(nz), k, dtype=np.int64))
+        ev_idx.append(nz)
+        ev_qty.append(orders[nz])
+
+    if ev_ts:
+        ts = np.concatenate(ev_ts)
+        order = np.argsort(ts, kind="stable")
+        ev = zip(
+            ts[order],
+            np.concatenate(ev_sym)[order],
+            np.concatenate(ev_idx)[order],
+            np.concatenate(ev_qty)[order],
+        )
+    else:
+        ev = iter(())
+
+    # 2) Fills walk the (sparse) order events with the live accounting rules
+    cash = to_cents(starting_cash)
+    held = {sym: 0 for sym in symbols}
+    avg = {sym: 0 for sym in symbols}
+    fill_ts: list[float] = []
+    fill_sym: list[int] = []
+    fill_qty: list[int] = []
+    fill_cash: list[float] = []
+    rejected = 0
+
+    for t, k, i, q in ev:
+        sym = symbols[k]
+        price = float_to_ticks(float(series[sym].price[i]))
+        apply = apply_buy if q > 0 else apply_sell
+        try:
+            cash, held[sym], avg[sym] = apply(cash, held[sym], avg[sym], price, abs(int(q)))
+        except OrderRejected:
+            rejected += 1
+            continue
+        fill_ts.append(float(t))
+        fill_sym.append(int(k))
+        fill_qty.append(int(q))
+        fill_cash.append(cents_to_float(cash))
+
+    # 3) Equity curve on the union of tick times, again vectorized
+    non_empty = [series[s].ts for s in symbols if len(series[s])]
+    grid = np.unique(np.concatenate(non_empty)) if non_empty else np.empty(0)
+    equity = np.full(len(grid), float(starting_cash))
+    if len(grid) and fill_ts:
+        f_ts = np.asarray(fill_ts)
+        f_sym = np.asarray(fill_sym, dtype=np.int64)
+        f_qty = np.asarray(fill_qty, dtype=np.int64)
+        at = np.searchsorted(f_ts, grid, side="right") - 1
+        after = at >= 0
+        equity[after] = np.asarray(fill_cash)[at[after]]
+        for k, sym in enumerate(symbols):
+            s = series[sym]
+            if len(s) == 0:
+                continue
+            mine = f_sym == k
+            if not mine.any():
+                continue
+            s_ts = f_ts[mine]
+            s_held = np.cumsum(f_qty[mine])
+            j = np.searchsorted(s_ts, grid, side="right") - 1
+            qty_curve = np.where(j >= 0, s_held[np.clip(j, 0, None)], 0)
+            p = np.searchsorted(s.ts, grid, side="right") - 1
+            price_curve = s.price[np.clip(p, 0, None)]
+            equity += qty_curve * price_curve
+
+    last_prices = {sym: float(series[sym].price[-1]) for sym in symbols if len(series[sym])}
+    final_equity = cents_to_float(cash) + sum(held[s] * last_prices.get(s, 0.0) for s in symbols)
+    if len(equity):
+        peak = np.maximum.accumulate(equity)
+        max_dd = float(np.max((peak - equity) / peak))
+    else:
+        max_dd = 0.0
+
+    return BacktestResult(
+        params=params,
+        starting_cash=float(starting_cash),
+        final_cash=cents_to_float(cash),
+        final_equity=final_equity,
+        total_return=final_equity / float(starting_cash) - 1.0,
+        max_drawdown=max_dd,
+        fills=len(fill_ts),
+        rejected=rejected,
+        positions={s: q for s, q in held.items() if q},
+        equity_ts=grid if keep_curve else None,
+        equity=equity if keep_curve else None,
+    )
+
+
+def param_grid(**axes: Iterable[Any]) -> list[dict[str, Any]]:
+    """param_grid(fast=[5, 10], slow=[30, 60]) -> every combination as kwargs."""
+    keys = list(axes)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*axes.values())]
+
+
+# Worker-process state, set once per worker so the price arrays aren't
+# pickled again for every parameter set.
+_worker_series: Mapping[str, PriceSeries] = {}
+_worker_strategy: Optional[Strategy] = None
+_worker_cash: Decimal = STARTING_CASH
+
+
+def _init_worker(series, strategy, starting_cash) -> None:
+    global _worker_series, _worker_strategy, _worker_cash
+    _worker_series, _worker_strategy, _worker_cash = series, strategy, starting_cash
+
+
+def _run_one(params: dict[str, Any]) -> BacktestResult:
+    return run_backtest(_worker_series, _worker_strategy, params, _worker_cash, keep_curve=False)
+
+
+def run_grid(
+    series: Mapping[str, PriceSeries],
+    strategy: Strategy,
+    grid: Iterable[Mapping[str, Any]],
+    starting_cash: Decimal = STARTING_CASH,
+    processes: Optional[int] = None,
+) -> list[BacktestResult]:
+    """Run one backtest per parameter set across a process pool, results in grid order."""
+    grid = [dict(p) for p in grid]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(grid) <= 1:
+        return [run_backtest(series, strategy, p, starting_cash, keep_curve=False) for p in grid]
+
+    with ProcessPoolExecutor(
+        max_workers=min(processes, len(grid)),
+        initializer=_init_worker,
+        initargs=(dict(series), strategy, starting_cash),
+    ) as pool:
+        chunksize = max(1, len(grid) // (processes * 4))
+        return list(pool.map(_run_one, grid, chunksize=chunksize))
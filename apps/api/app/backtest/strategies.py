@@ -0,0 +1,51 @@
+"""
+Example strategies.
+
+A strategy is a module-level function `f(prices, **params) -> orders` where
+`prices` is a float64 array for one symbol and `orders` is an int array of
+the same length: >0 buys that many shares at that tick, <0 sells, 0 holds.
+Signals should be computed with whole-array NumPy operations; only the
+resulting fills are walked one by one. Module-level so process pools can
+pickle them.
+"""
+import numpy as np
+
+
+def _sma(prices: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(prices), np.nan)
+    if window <= 0 or window > len(prices):
+        return out
+    csum = np.cumsum(np.insert(prices, 0, 0.0))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def sma_crossover(prices: np.ndarray, fast: int = 10, slow: int = 30, qty: int = 10) -> np.ndarray:
+    """Go long `qty` when the fast SMA crosses above the slow one, flat when it crosses below."""
+    fast_ma = _sma(prices, fast)
+    slow_ma = _sma(prices, slow)
+    above = np.where(np.isnan(slow_ma), 0, (fast_ma > slow_ma).astype(np.int64))
+    target = above * qty
+    return np.diff(target, prepend=0)
+
+
+def mean_reversion(prices: np.ndarray, window: int = 20, z_entry: float = 2.0, qty: int = 10) -> np.ndarray:
+    """Buy `qty` when price drops z_entry std below its SMA, exit when it reverts."""
+    ma = _sma(prices, window)
+    csum2 = np.cumsum(np.insert(prices * prices, 0, 0.0))
+    var = np.full(len(prices), np.nan)
+    if 0 < window <= len(prices):
+        var[window - 1:] = (csum2[window:] - csum2[:-window]) / window - ma[window - 1:] ** 2
+    std = np.sqrt(np.clip(var, 0.0, None))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (prices - ma) / std
+
+    enter = z < -z_entry
+    exit_ = z >= 0
+    # Hold from an entry until the next exit: forward-fill the last event
+    state = np.where(enter, 1, np.where(exit_, 0, -1))
+    idx = np.where(state >= 0, np.arange(len(state)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    held = np.where(state[idx] == 1, qty, 0)
+    held[(state[idx] < 0)] = 0
+    return np.diff(held, prepend=0)
@@ -0,0 +1,96 @@
+"""
+Move cold ticks out of Postgres into the columnar archive.
+
+    TICK_ARCHIVE_DIR=/var/lib/broker/ticks python -m app.cli.archive --keep-days 7
+    python -m app.cli.archive --keep-days 30 --symbol AAPL --dry-run
+
+Whole UTC days older than the kept window are written per symbol and day
+(see app.market.archive) and then deleted from market_ticks, one day per
+transaction, oldest first. A rerun after an interruption picks up where it
+stopped: days already on disk are merged, not duplicated. Point every API
+worker and analysis job at the same TICK_ARCHIVE_DIR.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.market.archive import day_start, tick_archive
+from app.models.instrument import Instrument
+from app.models.market_tick import MarketTick
+
+
+def _day_ticks(db, symbol: str, start: datetime, end: datetime) -> tuple[np.ndarray, np.ndarray]:
+    rows = db.execute(
+        select(MarketTick.ts, MarketTick.price)
+        .where(MarketTick.symbol == symbol, MarketTick.ts >= start, MarketTick.ts < end)
+        .order_by(MarketTick.ts, MarketTick.id)
+    ).all()
+    ts = np.fromiter((r[0].timestamp() for r in rows), np.float64, len(rows))
+    price = np.fromiter((r[1] for r in rows), np.float64, len(rows))
+    return ts, price
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.archive")
+    parser.add_argument("--keep-days", type=int, default=7, help="days of ticks to keep in Postgres")
+    parser.add_argument("--symbol", action="append", help="only these symbols (repeatable)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not tick_archive.enabled:
+        parser.error("TICK_ARCHIVE_DIR is not set")
+    if args.keep_days < 1:
+        parser.error("--keep-days must be >= 1 (today is still being written)")
+
+    cutoff = day_start(datetime.now(timezone.utc).date() - timedelta(days=args.keep_days))
+    print(f"[archive] archiving ticks before {cutoff:%Y-%m-%d} into {settings.TICK_ARCHIVE_DIR}")
+
+    t0 = time.perf_counter()
+    total = 0
+    db = SessionLocal()
+    try:
+        symbols = [s.upper() for s in args.symbol] if args.symbol else db.scalars(select(Instrument.symbol)).all()
+        for symbol in sorted(symbols):
+            first = db.scalar(
+                select(func.min(MarketTick.ts)).where(MarketTick.symbol == symbol, MarketTick.ts < cutoff)
+            )
+            if first is None:
+                continue
+            day = first.astimezone(timezone.utc).date()
+            while day_start(day) < cutoff:
+                start, end = day_start(day), day_start(day + timedelta(days=1))
+                ts, price = _day_ticks(db, symbol, start, end)
+                if len(ts):
+                    if args.dry_run:
+                        print(f"[archive] {symbol} {day}: {len(ts)} ticks (dry run)")
+                        db.rollback()
+                    else:
+                        # On disk (fsynced) before the rows go away
+                        stored = tick_archive.write_day(symbol, day, ts, price)
+                        db.execute(
+                            delete(MarketTick).where(
+                                MarketTick.symbol == symbol, MarketTick.ts >= start, MarketTick.ts < end
+                            )
+                        )
+                        db.commit()
+                        print(f"[archive] {symbol} {day}: {len(ts)} ticks moved ({stored} archived)")
+                    total += len(ts)
+                day += timedelta(days=1)
+    finally:
+        db.close()
+
+    verb = "would move" if args.dry_run else "moved"
+    print(f"[archive] {verb} {total} ticks in {time.perf_counter() - t0:.1f}s")
+    if total and not args.dry_run:
+        print("[archive] run VACUUM market_ticks to return the space to Postgres")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
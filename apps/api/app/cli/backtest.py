@@ -0,0 +1,60 @@
+"""
+Backtest a strategy from app.backtest.strategies over stored ticks.
+
+    python -m app.cli.backtest sma_crossover AAPL MSFT --grid fast=5,10 slow=30,60 qty=10
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from app.backtest import load_ticks, param_grid, run_grid
+from app.backtest import strategies
+from app.core.database import ReadSessionLocal
+
+
+def _axis(spec: str) -> tuple[str, list]:
+    name, _, values = spec.partition("=")
+    parsed = []
+    for v in values.split(","):
+        try:
+            parsed.append(int(v))
+        except ValueError:
+            parsed.append(float(v))
+    return name, parsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.backtest")
+    parser.add_argument("strategy", help="function name in app.backtest.strategies")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("--grid", nargs="*", default=[], metavar="NAME=V1,V2")
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args(argv)
+
+    strategy = getattr(strategies, args.strategy, None)
+    if strategy is None or args.strategy.startswith("_"):
+        print(f"[backtest] unknown strategy {args.strategy!r}", file=sys.stderr)
+        return 1
+
+    db = ReadSessionLocal()
+    try:
+        series = load_ticks(db, args.symbols, args.since, args.until)
+    finally:
+        db.close()
+    print(f"[backtest] loaded {sum(len(s) for s in series.values())} ticks for {list(series)}")
+
+    grid = param_grid(**dict(_axis(g) for g in args.grid)) or [{}]
+    results = run_grid(series, strategy, grid, processes=args.processes)
+    results.sort(key=lambda r: r.total_return, reverse=True)
+    for r in results:
+        print(
+            f"{r.params}  return={r.total_return:+.2%}  max_dd={r.max_drawdown:.2%}"
+            f"  equity={r.final_equity:.2f}  fills={r.fills}  rejected={r.rejected}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
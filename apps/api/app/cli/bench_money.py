@@ -0,0 +1,190 @@
+"""
+Microbenchmark: fixed-point money (app.core.money) vs the old Decimal path.
+
+    python -m app.cli.bench_money --fills 200000
+
+Replays the same random order flow through the integer accounting functions
+and through a Decimal reference (the quantize-per-step code they replaced),
+checks that every cash balance and average price matches to the last
+cent/tick, then times fills, price steps and portfolio valuation.
+Nothing is read from or written to the database.
+"""
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from app.core.money import (
+    PRICE_SCALE,
+    cents_to_decimal,
+    ticks_to_decimal,
+    to_cents,
+    to_ticks,
+)
+from app.market.engine import step
+from app.services.accounting import STARTING_CASH, OrderRejected, apply_buy, apply_sell
+from app.services.instruments import InstrumentSpec
+
+PRICE_STEP = Decimal("0.0001")
+CASH_STEP = Decimal("0.01")
+
+
+def _q_price(x: Decimal) -> Decimal:
+    return x.quantize(PRICE_STEP, rounding=ROUND_HALF_UP)
+
+
+def _q_cash(x: Decimal) -> Decimal:
+    return x.quantize(CASH_STEP, rounding=ROUND_HALF_UP)
+
+
+def _dec_buy(cash: Decimal, held: int, avg: Decimal, price: Decimal, qty: int):
+    cost = _q_cash(price * Decimal(qty))
+    if cash < cost:
+        raise OrderRejected("Insufficient cash")
+    new_avg = price if held == 0 else _q_price((avg * Decimal(held) + cost) / Decimal(held + qty))
+    return _q_cash(cash - cost), held + qty, new_avg
+
+
+def _dec_sell(cash: Decimal, held: int, avg: Decimal, price: Decimal, qty: int):
+    if held < qty:
+        raise OrderRejected("Insufficient shares")
+    return _q_cash(cash + _q_cash(price * Decimal(qty))), held - qty, avg
+
+
+def _dec_step(vol: Decimal, price: Decimal) -> Decimal:
+    z = Decimal(str(random.gauss(0, 1)))
+    new_price = price * (Decimal("1.0") + Decimal("0.00005") + vol * z)
+    return max(_q_price(new_price), PRICE_STEP)
+
+
+def _order_flow(n: int, seed: int) -> list[tuple[int, int, int]]:
+    """(side, price ticks, qty) with side +1 buy / -1 sell."""
+    rng = random.Random(seed)
+    price = 185 * PRICE_SCALE
+    flow = []
+    for _ in range(n):
+        price = max(1, price + rng.randint(-2500, 2500))
+        flow.append((1 if rng.random() < 0.55 else -1, price, rng.randint(1, 25)))
+    return flow
+
+
+def _run_int(flow):
+    cash, held, avg = to_cents(STARTING_CASH) * 1000, 0, 0
+    out = []
+    for side, price, qty in flow:
+        try:
+            cash, held, avg = (apply_buy if side > 0 else apply_sell)(cash, held, avg, price, qty)
+        except OrderRejected:
+            pass
+        out.append((cash, held, avg))
+    return out
+
+
+def _run_decimal(flow):
+    cash, held, avg = STARTING_CASH * 1000, 0, Decimal("0")
+    out = []
+    for side, price, qty in flow:
+        try:
+            cash, held, avg = (_dec_buy if side > 0 else _dec_sell)(cash, held, avg, price, qty)
+        except OrderRejected:
+            pass
+        out.append((cash, held, avg))
+    return out
+
+
+def _value_int(book, quotes):
+    total = 0
+    for sym, qty, avg in book:
+        total += qty * quotes[sym]
+    return total
+
+
+def _value_decimal(book, quotes):
+    total = Decimal("0")
+    for sym, qty, avg in book:
+        total += Decimal(qty) * quotes[sym]
+    return total
+
+
+def _timed(fn, *args, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.bench_money")
+    parser.add_argument("--fills", type=int, default=100_000)
+    parser.add_argument("--steps", type=int, default=100_000)
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    flow = _order_flow(args.fills, args.seed)
+
+    t_int, res_int = _timed(_run_int, flow, repeat=args.repeat)
+    dec_flow = [(side, ticks_to_decimal(p), qty) for side, p, qty in flow]
+    t_dec, res_dec = _timed(_run_decimal, dec_flow, repeat=args.repeat)
+    mismatches = sum(
+        1
+        for (ci, hi, ai), (cd, hd, ad) in zip(res_int, res_dec)
+        if (cents_to_decimal(ci), hi, ticks_to_decimal(ai)) != (cd, hd, ad)
+        or (ci, ai) != (to_cents(cd), to_ticks(ad))
+    )
+
+    spec = InstrumentSpec("BENCH", 185 * PRICE_SCALE, 0.002, 1, True)
+    vol = Decimal("0.002")
+
+    def int_steps():
+        p = spec.start_price
+        for _ in range(args.steps):
+            p = step(spec, p)
+        return p
+
+    def dec_steps():
+        p = Decimal("185")
+        for _ in range(args.steps):
+            p = _dec_step(vol, p)
+        return p
+
+    t_step_int, _ = _timed(int_steps, repeat=args.repeat)
+    t_step_dec, _ = _timed(dec_steps, repeat=args.repeat)
+
+    rng = random.Random(args.seed)
+    syms = [f"S{i}" for i in range(args.positions)]
+    q_int = {s: rng.randint(PRICE_SCALE, 1000 * PRICE_SCALE) for s in syms}
+    q_dec = {s: ticks_to_decimal(p) for s, p in q_int.items()}
+    book = [(s, rng.randint(1, 500), 0) for s in syms]
+    rounds = max(1, args.fills // max(1, args.positions))
+
+    def int_values():
+        return [_value_int(book, q_int) for _ in range(rounds)]
+
+    def dec_values():
+        return [_value_decimal(book, q_dec) for _ in range(rounds)]
+
+    t_val_int, v_int = _timed(int_values, repeat=args.repeat)
+    t_val_dec, v_dec = _timed(dec_values, repeat=args.repeat)
+    mismatches += sum(ticks_to_decimal(a) != b for a, b in zip(v_int, v_dec))
+
+    def line(name, n, t_i, t_d):
+        print(
+            f"{name:<10} {n:>9,}  int {t_i * 1e9 / n:8.0f} ns/op  "
+            f"decimal {t_d * 1e9 / n:8.0f} ns/op  x{t_d / t_i:5.2f}"
+        )
+
+    line("fills", args.fills, t_int, t_dec)
+    line("steps", args.steps, t_step_int, t_step_dec)
+    line("valuation", rounds * args.positions, t_val_int, t_val_dec)
+    print(f"mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
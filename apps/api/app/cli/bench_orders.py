@@ -0,0 +1,141 @@
+"""
+Order throughput vs latency: one commit per order vs group commit.
+
+    python -m app.cli.bench_orders --clients 32 --orders 4000 --windows 0,1,2,5
+
+Creates throwaway accounts, then drives the same order flow (alternating
+buys and sells of one share) from concurrent client threads through:
+
+  direct     execute + commit per order, like POST /trading/orders
+  window=N   the group-commit sequencer with an N ms batch window
+
+and prints orders/s, latency percentiles and the mean batch size for each.
+The accounts are deleted afterwards.
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.services import state_versions
+from app.services.orders import execute_order
+from app.services.sequencer import OrderSequencer
+
+EMAIL = "bench-orders-{n}@sim.local"
+
+
+def _create_users(n: int) -> list[int]:
+    db = SessionLocal()
+    try:
+        ids = db.scalars(
+            text(
+                "INSERT INTO users (email, password_hash) "
+                "SELECT format(:email, g), 'x' FROM generate_series(1, :n) g RETURNING id"
+            ),
+            {"email": EMAIL.replace("{n}", "%s"), "n": n},
+        ).all()
+        db.execute(
+            text(
+                "INSERT INTO accounts (user_id, cash_balance, opening_balance) "
+                "SELECT unnest(CAST(:ids AS int[])), 1000000000, 1000000000"
+            ),
+            {"ids": ids},
+        )
+        db.commit()
+        return list(ids)
+    finally:
+        db.close()
+
+
+def _drop_users() -> None:
+    db = SessionLocal()
+    try:
+        # orders/positions/accounts go with the users (ON DELETE CASCADE)
+        db.execute(text("DELETE FROM users WHERE email LIKE :p"), {"p": EMAIL.replace("{n}", "%")})
+        db.commit()
+    finally:
+        db.close()
+
+
+def _direct(uid: int, symbol: str, side: str, qty: int) -> None:
+    db = SessionLocal()
+    try:
+        execute_order(db, uid, symbol, side, qty)
+        state_versions.notify_changed(db, uid)
+        db.commit()
+        state_versions.bump(uid)
+    finally:
+        db.close()
+
+
+def _drive(place: Callable[[int, str, str, int], None], users: list[int], clients: int, orders: int, symbol: str):
+    per_client = orders // clients
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def client(k: int) -> None:
+        mine: list[float] = []
+        uid = users[k % len(users)]
+        for i in range(per_client):
+            t0 = time.perf_counter()
+            place(uid, symbol, "buy" if i % 2 == 0 else "sell", 1)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, sorted(latencies)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.bench_orders")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=4000, help="per mode")
+    parser.add_argument("--windows", default="0,1,2,5", help="batch windows to try, in ms")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--symbol", default="AAPL")
+    args = parser.parse_args(argv)
+
+    _drop_users()
+    users = _create_users(args.clients)
+    try:
+        print(f"{'mode':<12} {'orders/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+
+        def report(name: str, elapsed: float, lat: list[float], batch: float) -> None:
+            p99 = lat[min(len(lat) - 1, int(0.99 * len(lat)))]
+            print(
+                f"{name:<12} {len(lat) / elapsed:9.0f} {statistics.median(lat) * 1e3:8.2f} "
+                f"{p99 * 1e3:8.2f} {batch:11.1f}"
+            )
+
+        elapsed, lat = _drive(_direct, users, args.clients, args.orders, args.symbol)
+        report("direct", elapsed, lat, 1.0)
+
+        for window in (float(w) for w in args.windows.split(",")):
+            seq = OrderSequencer(window_ms=window, max_batch=args.max_batch)
+            seq.start()
+            try:
+                elapsed, lat = _drive(
+                    lambda *order: seq.submit(*order).result(),
+                    users, args.clients, args.orders, args.symbol,
+                )
+            finally:
+                seq.stop()
+            report(f"window={window:g}", elapsed, lat, seq.stats()["mean_batch"])
+    finally:
+        _drop_users()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+End-of-day statements for every account.
+
+    python -m app.cli.eod                       # today (UTC), at the close
+    python -m app.cli.eod --day 2026-10-16      # backfill / rerun a day
+    python -m app.cli.eod --processes 8 --chunk 25000
+
+Closing prices are read once, then user-id ranges are spread over a process
+pool; each range is a single INSERT ... SELECT ... ON CONFLICT in its own
+transaction (see app.services.eod). Positions are marked as they stand when
+the job runs, so run it at the close; --day picks the closing prices and the
+order window. A past day's close is the last tick before it ended, from
+market_ticks or the tick archive; the job refuses to run if a held symbol
+has none.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+
+from app.core.database import SessionLocal, engine
+from app.services.eod import EodJob, MissingCloses, closing_prices, run_range, user_ranges
+
+_job: EodJob | None = None
+
+
+def _init_worker(job: EodJob) -> None:
+    global _job
+    _job = job
+    # Connections inherited from the parent must not be shared across processes
+    engine.dispose(close=False)
+
+
+def _run(bounds: tuple[int, int]) -> int:
+    db = SessionLocal()
+    try:
+        return run_range(db, _job, *bounds)
+    finally:
+        db.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.eod")
+    parser.add_argument("--day", type=date.fromisoformat, default=datetime.now(timezone.utc).date())
+    parser.add_argument("--chunk", type=int, default=20_000, help="user ids per statement")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        try:
+            closes = closing_prices(db, args.day)
+        except MissingCloses as e:
+            print(f"[eod] {e}", file=sys.stderr)
+            return 1
+        ranges = user_ranges(db, args.chunk)
+    finally:
+        db.close()
+    engine.dispose()
+
+    job = EodJob(day=args.day, closes=closes)
+    print(f"[eod] {args.day}: {len(closes)} closes, {len(ranges)} ranges, {args.processes} processes")
+
+    t0 = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(args.processes, len(ranges))),
+        initializer=_init_worker,
+        initargs=(job,),
+    ) as pool:
+        for n, fut in enumerate(as_completed([pool.submit(_run, r) for r in ranges]), 1):
+            written += fut.result()
+            if n % 10 == 0 or n == len(ranges):
+                rate = written / (time.perf_counter() - t0)
+                print(f"[eod] {n}/{len(ranges)} ranges, {written} statements ({rate:,.0f}/s)")
+
+    print(f"[eod] wrote {written} statements in {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
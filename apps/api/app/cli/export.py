@@ -0,0 +1,63 @@
+"""
+Bulk export of tick and order history.
+
+    python -m app.cli.export ticks --symbol AAPL --format parquet -o aapl.parquet
+    python -m app.cli.export orders --since 2026-01-01 -o orders.csv
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from app.core.database import ReadSessionLocal
+from app.services.export import (
+    CHUNK_ROWS,
+    ORDER_COLUMNS,
+    TICK_COLUMNS,
+    ExportUnavailable,
+    archived_ticks,
+    iter_export,
+    order_query,
+    tick_query,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.export")
+    parser.add_argument("table", choices=["ticks", "orders"])
+    parser.add_argument("--symbol", help="ticks only")
+    parser.add_argument("--user-id", type=int, help="orders only; default is every user")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("--format", choices=["csv", "arrow", "parquet"], default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("-o", "--output", default="-", help="file path, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    head = ()
+    if args.table == "ticks":
+        stmt, columns = tick_query(args.symbol, args.since, args.until), TICK_COLUMNS
+        head = archived_ticks(args.symbol, args.since, args.until, args.chunk_rows)
+    else:
+        stmt, columns = order_query(args.user_id, args.since, args.until), ORDER_COLUMNS
+
+    try:
+        chunks = iter_export(ReadSessionLocal, stmt, columns, args.format, args.chunk_rows, head)
+    except ExportUnavailable as e:
+        print(f"[export] {e}", file=sys.stderr)
+        return 1
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        total = 0
+        for chunk in chunks:
+            out.write(chunk)
+            total += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"[export] wrote {total} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
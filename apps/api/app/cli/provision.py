@@ -0,0 +1,185 @@
+"""
+Bulk-create users with accounts (and optional starting positions).
+
+    # 100k synthetic traders sharing one password: hashed once, COPY'd in batches
+    python -m app.cli.provision 100000 --email 'trader{n}@sim.local' --password 'sim-pass'
+
+    # a classroom cohort with per-student passwords, hashed across a process pool
+    python -m app.cli.provision 40 --email 'student{n}@school.edu' --password 'welcome-{n}'
+
+Rows are COPY'd into a temp table, then users, accounts and positions are
+inserted by a single statement per batch. Seed positions are bought at the
+current market price and paid for out of --cash, so a seeded account starts
+with the same equity as an unseeded one. Existing emails are skipped, so a
+rerun only creates what is missing. With a per-user password the run time
+is bounded by bcrypt: use --bcrypt-rounds to trade hash strength for speed
+on throwaway load-test accounts.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Optional
+
+from app.core.database import SessionLocal, engine
+from app.core.money import cents_to_decimal, notional_cents, ticks_to_decimal, to_cents
+from app.core.security import pwd_context
+from app.services.accounting import STARTING_CASH
+from app.services.instruments import instruments
+from app.services.quotes import get_quotes
+
+PROVISION_SQL = """
+WITH u AS (
+    INSERT INTO users (email, password_hash)
+    SELECT email, password_hash FROM _provision
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id
+), a AS (
+    INSERT INTO accounts (user_id, cash_balance, opening_balance)
+    SELECT id, %(cash)s, %(opening)s FROM u
+    RETURNING user_id
+), p AS (
+    INSERT INTO positions (user_id, symbol, qty, avg_price)
+    SELECT a.user_id, s.symbol, s.qty, s.price
+    FROM a CROSS JOIN unnest(%(symbols)s::varchar[], %(qtys)s::int[], %(prices)s::numeric[])
+        AS s(symbol, qty, price)
+)
+SELECT count(*) FROM a
+"""
+
+_worker_ctx = None
+
+
+def _init_hasher(rounds: Optional[int]) -> None:
+    global _worker_ctx
+    _worker_ctx = pwd_context.copy(bcrypt__default_rounds=rounds) if rounds else pwd_context
+
+
+def _hash(password: str) -> str:
+    return _worker_ctx.hash(password)
+
+
+def _parse_position(spec: str) -> tuple[str, int]:
+    symbol, _, qty = spec.partition(":")
+    try:
+        n = int(qty)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{spec!r}: expected SYMBOL:QTY") from None
+    if not symbol or n < 1:
+        raise argparse.ArgumentTypeError(f"{spec!r}: quantity must be >= 1")
+    return symbol.upper(), n
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.provision")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--email", default="trader{n}@sim.local", help="template, {n} is the user number")
+    parser.add_argument("--start", type=int, default=1, help="first {n}")
+    parser.add_argument("--password", help="template; without {n} every user shares one hash")
+    parser.add_argument("--password-hash", help="precomputed hash for every user (skips hashing)")
+    parser.add_argument("--bcrypt-rounds", type=int, help="cost for newly hashed passwords")
+    parser.add_argument("--cash", type=Decimal, default=STARTING_CASH)
+    parser.add_argument("--position", action="append", default=[], metavar="SYMBOL:QTY",
+                        type=_parse_position,
+                        help="seed position bought at the current market price out of --cash; repeatable")
+    parser.add_argument("--batch", type=int, default=20_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if "{n}" not in args.email:
+        parser.error("--email must contain {n}")
+    if bool(args.password) == bool(args.password_hash):
+        parser.error("give exactly one of --password / --password-hash")
+
+    positions = args.position
+    quotes: dict[str, int] = {}
+    if positions:
+        instruments.reload()
+        unknown = [s for s, _ in positions if not instruments.is_active(s)]
+        if unknown:
+            parser.error(f"unknown symbols: {', '.join(unknown)}")
+        if len({s for s, _ in positions}) != len(positions):
+            parser.error("each --position symbol may only be given once")
+        db = SessionLocal()
+        try:
+            quotes = get_quotes(db, [s for s, _ in positions])
+        finally:
+            db.close()
+        unpriced = [s for s, _ in positions if s not in quotes]
+        if unpriced:
+            parser.error(f"no market price yet for: {', '.join(unpriced)} (is the market engine running?)")
+    # The SQL inserts exactly these prices and amounts, never a fresher quote
+    symbols = [s for s, _ in positions]
+    qtys = [q for _, q in positions]
+    prices = [ticks_to_decimal(quotes[s]) for s in symbols]
+    cost = sum(notional_cents(quotes[s], q) for s, q in positions)
+    if cost > to_cents(args.cash):
+        parser.error(f"positions cost {cents_to_decimal(cost)} at current prices, more than --cash {args.cash}")
+    cash = cents_to_decimal(to_cents(args.cash) - cost)
+    opening = cash + sum(p * q for p, q in zip(prices, qtys))  # cash + cost basis
+
+    per_user = bool(args.password) and "{n}" in args.password
+    shared_hash = args.password_hash
+    if args.password and not per_user:
+        _init_hasher(args.bcrypt_rounds)
+        shared_hash = _hash(args.password)
+
+    pool = None
+    if per_user:
+        pool = ProcessPoolExecutor(
+            max_workers=args.processes,
+            initializer=_init_hasher,
+            initargs=(args.bcrypt_rounds,),
+        )
+
+    t0 = time.perf_counter()
+    created = 0
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TEMP TABLE _provision (email varchar(320), password_hash varchar(255))"
+                " ON COMMIT DELETE ROWS"
+            )
+        conn.commit()
+
+        end = args.start + args.count
+        for lo in range(args.start, end, args.batch):
+            ns = range(lo, min(lo + args.batch, end))
+            emails = [args.email.format(n=n) for n in ns]
+            if per_user:
+                passwords = [args.password.format(n=n) for n in ns]
+                chunk = max(1, len(passwords) // (args.processes * 4))
+                hashes = list(pool.map(_hash, passwords, chunksize=chunk))
+            else:
+                hashes = [shared_hash] * len(emails)
+
+            with conn.cursor() as cur:
+                with cur.copy("COPY _provision (email, password_hash) FROM STDIN") as copy:
+                    for row in zip(emails, hashes):
+                        copy.write_row(row)
+                cur.execute(
+                    PROVISION_SQL,
+                    {"cash": cash, "opening": opening, "symbols": symbols, "qtys": qtys, "prices": prices},
+                )
+                created += cur.fetchone()[0]
+            conn.commit()
+
+            done = ns.stop - args.start
+            rate = done / (time.perf_counter() - t0)
+            print(f"[provision] {done}/{args.count} processed, {created} created ({rate:,.0f}/s)")
+    finally:
+        raw.close()
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - t0
+    print(f"[provision] created {created} users ({args.count - created} already existed) in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Query-budget and EXPLAIN regression check for every API route.
+
+Runs one representative request per route in-process against the database
+in DATABASE_URL, counts the SQL statements it issued and EXPLAINs each
+SELECT/UPDATE/DELETE. Exits non-zero when a route has no budget, goes over
+its budget, or plans a sequential scan on a guarded table.
+
+    python -m app.cli.query_budget --seed   # first run on a scratch database
+    python -m app.cli.query_budget
+
+--seed writes synthetic users, orders, positions and ticks: never point it
+at a database you care about.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine, read_engine
+from app.core.querybudget import RecordedStatement, StatementRecorder, budget_of
+from app.core.security import create_access_token, hash_password
+from app.main import app
+
+GUARDED_TABLES = {"market_ticks", "orders", "positions"}
+
+SEED_EMAIL = "qb-{n}@example.com"
+SEED_PASSWORD = "query-budget"
+
+# One representative request per (method, path template)
+REQUESTS: dict[tuple[str, str], dict[str, Any]] = {
+    ("GET", "/health"): {},
+    ("POST", "/auth/register"): {"json": {"email": "qb-new@example.com", "password": SEED_PASSWORD}},
+    ("POST", "/auth/login"): {"json": {"email": SEED_EMAIL.format(n=1), "password": SEED_PASSWORD}},
+    ("GET", "/me/account"): {"auth": True},
+    ("GET", "/market/symbols"): {},
+    ("GET", "/market/quote/{symbol}"): {"path": {"symbol": "AAPL"}},
+    ("GET", "/market/history/{symbol}"): {"path": {"symbol": "AAPL"}, "params": {"limit": 5000}},
+    ("POST", "/trading/orders"): {"auth": True, "json": {"symbol": "AAPL", "side": "buy", "qty": 1}},
+    ("GET", "/trading/positions"): {"auth": True},
+    ("GET", "/trading/orders"): {"auth": True},
+    ("GET", "/trading/account"): {"auth": True},
+    ("GET", "/trading/portfolio"): {"auth": True},
+    ("GET", "/trading/risk"): {"auth": True},
+    ("GET", "/export/ticks"): {"auth": True, "params": {"symbol": "AAPL"}},
+    ("GET", "/export/orders"): {"auth": True},
+    ("GET", "/admin/profiles"): {"admin": True},
+    ("GET", "/admin/profiles/{profile_id}"): {"admin": True, "path": {"profile_id": 1}},
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO market_prices (symbol, price)
+    SELECT symbol, start_price FROM instruments
+    ON CONFLICT (symbol) DO NOTHING
+    """,
+    """
+    INSERT INTO users (email, password_hash)
+    SELECT replace(:email, '{n}', g::text), :password_hash
+    FROM generate_series(1, :users) g
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO accounts (user_id, cash_balance, opening_balance)
+    SELECT id, 1000000, 1000000 + (SELECT coalesce(sum(10 * start_price), 0) FROM instruments)
+    FROM users WHERE email LIKE 'qb-%@example.com'
+    ON CONFLICT (user_id) DO NOTHING
+    """,
+    """
+    INSERT INTO positions (user_id, symbol, qty, avg_price)
+    SELECT u.id, i.symbol, 10, i.start_price
+    FROM users u CROSS JOIN instruments i
+    WHERE u.email LIKE 'qb-%@example.com'
+    ON CONFLICT ON CONSTRAINT uq_positions_user_symbol DO NOTHING
+    """,
+    """
+    INSERT INTO orders (user_id, symbol, side, qty, status, filled_price, created_at)
+    SELECT u.id, i.symbol, 'buy', 1, 'filled', i.start_price, now() - make_interval(mins => g)
+    FROM users u CROSS JOIN instruments i CROSS JOIN generate_series(1, :orders) g
+    WHERE u.email LIKE 'qb-%@example.com'
+    """,
+    """
+    INSERT INTO market_ticks (symbol, price, ts)
+    SELECT i.symbol, round(i.start_price * (1 + 0.05 * sin(g / 50.0))::numeric, 4),
+           now() - make_interval(secs => g * 2)
+    FROM instruments i CROSS JOIN generate_series(1, :ticks) g
+    """,
+]
+
+
+@dataclass
+class RouteReport:
+    method: str
+    path: str
+    budget: Optional[int]
+    status: Optional[int] = None
+    statements: list[RecordedStatement] = field(default_factory=list)
+    seq_scans: list[str] = field(default_factory=list)
+    problems: list[str] = field(default_factory=list)
+
+
+def seed(users: int, orders: int, ticks: int) -> None:
+    params = {
+        "email": SEED_EMAIL,
+        "password_hash": hash_password(SEED_PASSWORD),
+        "users": users,
+        "orders": orders,
+        "ticks": ticks,
+    }
+    with engine.begin() as conn:
+        for sql in SEED_SQL:
+            conn.execute(text(sql), params)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def _seq_scans(plan: Any) -> list[str]:
+    found = []
+    if isinstance(plan, dict):
+        if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in GUARDED_TABLES:
+            found.append(plan["Relation Name"])
+        for child in plan.get("Plans", ()):
+            found.extend(_seq_scans(child))
+        if "Plan" in plan:
+            found.extend(_seq_scans(plan["Plan"]))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(_seq_scans(item))
+    return found
+
+
+def explain(stmt: RecordedStatement) -> list[str]:
+    verb = stmt.statement.lstrip().split(None, 1)[0].upper()
+    if stmt.executemany or verb not in ("SELECT", "WITH", "UPDATE", "DELETE"):
+        return []
+    # Plain EXPLAIN never executes the statement
+    with stmt.engine.connect() as conn:
+        raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + stmt.statement, stmt.parameters).scalar()
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    return _seq_scans(plan)
+
+
+def _api_routes(routes):
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        elif hasattr(route, "original_router"):
+            # Newer FastAPI keeps included routers nested instead of copying their routes
+            yield from _api_routes(route.original_router.routes)
+
+
+def check_routes(client: TestClient, token: str) -> list[RouteReport]:
+    reports = []
+    for route in _api_routes(app.routes):
+        for method in sorted(route.methods - {"HEAD", "OPTIONS"}):
+            report = RouteReport(method, route.path, budget_of(route.endpoint))
+            reports.append(report)
+            if report.budget is None:
+                report.problems.append("no @query_budget declared")
+
+            spec = REQUESTS.get((method, route.path))
+            if spec is None:
+                report.problems.append("no request defined in app.cli.query_budget.REQUESTS")
+                continue
+
+            url = route.path.format(**spec.get("path", {}))
+            headers = {"Authorization": f"Bearer {token}"} if spec.get("auth") else {}
+            if spec.get("admin"):
+                headers["X-Admin-Token"] = settings.ADMIN_TOKEN or ""
+            with StatementRecorder([engine, read_engine]) as rec:
+                resp = client.request(method, url, json=spec.get("json"), params=spec.get("params"), headers=headers)
+                resp.read()
+            report.status = resp.status_code
+            report.statements = rec.statements
+
+            if resp.status_code >= 500:
+                report.problems.append(f"HTTP {resp.status_code}")
+            if report.budget is not None and len(rec) > report.budget:
+                report.problems.append(f"{len(rec)} statements > budget {report.budget}")
+            for stmt in rec.statements:
+                for table in explain(stmt):
+                    report.seq_scans.append(table)
+                    report.problems.append(f"Seq Scan on {table}: {stmt.statement.split()[0]} ...")
+    return reports
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.query_budget")
+    parser.add_argument("--seed", action="store_true", help="insert synthetic volumes first")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--orders", type=int, default=20, help="orders per user per symbol")
+    parser.add_argument("--ticks", type=int, default=100_000, help="ticks per symbol")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every statement")
+    args = parser.parse_args(argv)
+
+    if args.seed:
+        print(f"[query-budget] seeding {args.users} users, {args.ticks} ticks/symbol ...")
+        seed(args.users, args.orders, args.ticks)
+
+    with engine.connect() as conn:
+        uid = conn.execute(
+            text("SELECT id FROM users WHERE email = :e"), {"e": SEED_EMAIL.format(n=1)}
+        ).scalar()
+    if uid is None:
+        print("[query-budget] no seeded user found; run with --seed first", file=sys.stderr)
+        return 2
+    with engine.begin() as conn:
+        # register must hit its insert path, not the 409 shortcut
+        conn.execute(text("DELETE FROM users WHERE email = 'qb-new@example.com'"))
+
+    with TestClient(app) as client:
+        reports = check_routes(client, create_access_token(str(uid)))
+
+    failed = 0
+    for r in reports:
+        mark = "FAIL" if r.problems else "ok"
+        budget = "-" if r.budget is None else r.budget
+        print(f"{mark:4}  {r.method:6} {r.path:32} {len(r.statements):>3}/{budget:<3} HTTP {r.status}")
+        for p in r.problems:
+            print(f"        {p}")
+        if args.verbose:
+            for s in r.statements:
+                print(f"        | {' '.join(s.statement.split())[:160]}")
+        failed += bool(r.problems)
+
+    print(f"[query-budget] {len(reports) - failed}/{len(reports)} routes within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
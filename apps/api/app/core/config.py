@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -8,4 +10,60 @@ class Settings(BaseSettings):
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
-settings = Settings()
\ No newline at end of file
+    # Optional replica for read-only routes; unset means everything hits DATABASE_URL
+    READ_DATABASE_URL: Optional[str] = None
+    # After a user writes, their reads stay on the primary this long (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Ticks per symbol kept in memory by each API worker for /market/history
+    TICK_BUFFER_SIZE: int = 512
+
+    # "external": app.market.engine runs as its own process (docker `market` service).
+    # "embedded": the API runs the engine as a background task. With several
+    # workers only the first to take a Postgres advisory lock runs it; the others
+    # follow its ticks from the DB as in external mode.
+    MARKET_ENGINE_MODE: Literal["external", "embedded"] = "external"
+    # Embedded mode writes market_ticks rows in batches of this many ticks
+    # (market_prices is still updated every tick)
+    MARKET_PERSIST_EVERY: int = 5
+
+    # Shared-memory segment the engine publishes latest prices to; API workers on
+    # the same host (IPC namespace) read quotes from it. Unset/empty disables it.
+    # Order fills never price from the board.
+    PRICE_BOARD_NAME: Optional[str] = None
+    PRICE_BOARD_SLOTS: int = 1024
+    # Board entries older than this (about two missed ticks) are ignored and quotes hit the DB
+    PRICE_BOARD_MAX_AGE_SECONDS: float = 5.0
+
+    # Group commit for POST /trading/orders: one transaction per micro-batch of
+    # orders, collected for up to the window or until the batch is full
+    ORDER_SEQUENCER_ENABLED: bool = False
+    ORDER_BATCH_WINDOW_MS: float = 2.0
+    ORDER_BATCH_MAX: int = 64
+    # How long a request waits for its batch before answering 503
+    ORDER_SEQUENCER_TIMEOUT_SECONDS: float = 10.0
+
+    # Directory for archived (cold) ticks, see app.cli.archive; unset = no archive
+    TICK_ARCHIVE_DIR: Optional[str] = None
+
+    # Per-user token buckets: sustained requests/second and burst size per route
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_ORDERS_PER_SEC: float = 5.0
+    RATE_LIMIT_ORDERS_BURST: int = 10
+    RATE_LIMIT_PORTFOLIO_PER_SEC: float = 2.0
+    RATE_LIMIT_PORTFOLIO_BURST: int = 5
+    RATE_LIMIT_READS_PER_SEC: float = 5.0  # each of positions, order history, account
+    RATE_LIMIT_READS_BURST: int = 10
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Must be >= burst / rate for every route so eviction only drops full buckets
+    RATE_LIMIT_IDLE_SECONDS: float = 60.0
+
+    # Profiling is off unless one of these is set. Requests sending
+    # `X-Profile: <ADMIN_TOKEN>` are always profiled; the same token in
+    # `X-Admin-Token` unlocks /admin/profiles.
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 1.0
+    PROFILE_KEEP: int = 50
+
+settings = Settings()
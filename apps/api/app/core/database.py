@@ -1,10 +1,20 @@
+import time
+
+from fastapi import Depends
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
+from .security import get_current_user_id
 
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(settings.READ_DATABASE_URL, pool_pre_ping=True)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 class Base(DeclarativeBase):
     pass
 
@@ -13,4 +23,56 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# user_id -> monotonic deadline until which that user's reads go to the primary.
+# Per-process: a user pinned in one worker is not pinned in the others.
+_pinned_until: dict[int, float] = {}
+_PIN_PRUNE_AT = 10_000
+
+
+def pin_to_primary(user_id: int) -> None:
+    now = time.monotonic()
+    if len(_pinned_until) >= _PIN_PRUNE_AT:
+        for uid, until in list(_pinned_until.items()):
+            if until <= now:
+                _pinned_until.pop(uid, None)
+    _pinned_until[user_id] = now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def is_pinned(user_id: int) -> bool:
+    until = _pinned_until.get(user_id)
+    return until is not None and until > time.monotonic()
+
+
+def get_read_db():
+    """Session for read-only routes that carry no per-user state (market data)."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_user_read_db(user_id: str = Depends(get_current_user_id)):
+    """Read-only session for a user's own data; primary while they are pinned."""
+    factory = SessionLocal if is_pinned(int(user_id)) else ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_user_write_db(user_id: str = Depends(get_current_user_id)):
+    """Primary session for a user's writes.
+
+    Call pin_to_primary(user_id) right after committing: teardown runs after
+    the response has been sent, too late for the client's next read.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,58 @@
+"""
+Fixed-point money used on the hot paths.
+
+Prices are integer ticks of 0.0001 and cash is integer cents, matching the
+Numeric(12, 4) / Numeric(12, 2) columns exactly. Arithmetic stays in Python
+ints and only the DB and the JSON responses see Decimal / float, via the
+converters below. Rounding is half-up (away from zero), the same rule the
+old Decimal code applied with ROUND_HALF_UP.
+"""
+import math
+from decimal import Decimal
+
+PRICE_SCALE = 10_000  # ticks per 1.00
+CASH_SCALE = 100  # cents per 1.00
+TICKS_PER_CENT = PRICE_SCALE // CASH_SCALE
+
+
+def div_half_up(n: int, d: int) -> int:
+    """n / d rounded half away from zero, for d > 0."""
+    if n >= 0:
+        return (2 * n + d) // (2 * d)
+    return -((-2 * n + d) // (2 * d))
+
+
+def to_ticks(x: Decimal | str | int) -> int:
+    """Exact conversion of a price with at most 4 decimals (DB values)."""
+    return int(Decimal(x).scaleb(4).to_integral_value())
+
+
+def float_to_ticks(x: float) -> int:
+    """Nearest tick for a non-negative float price (numpy arrays, random walk)."""
+    return math.floor(x * PRICE_SCALE + 0.5)
+
+
+def ticks_to_decimal(ticks: int) -> Decimal:
+    return Decimal(ticks).scaleb(-4)
+
+
+def ticks_to_float(ticks: int) -> float:
+    return ticks / PRICE_SCALE
+
+
+def to_cents(x: Decimal | str | int) -> int:
+    """Exact conversion of a cash amount with at most 2 decimals (DB values)."""
+    return int(Decimal(x).scaleb(2).to_integral_value())
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def cents_to_float(cents: int) -> float:
+    return cents / CASH_SCALE
+
+
+def notional_cents(price_ticks: int, qty: int) -> int:
+    """price * qty rounded to the cent."""
+    return div_half_up(price_ticks * qty, TICKS_PER_CENT)
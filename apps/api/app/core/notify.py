@@ -0,0 +1,79 @@
+"""
+Postgres LISTEN/NOTIFY fan-out for the in-process caches.
+
+One daemon thread per process holds a dedicated autocommit connection and
+dispatches notifications to the handlers registered with `subscribe`.
+Every handler is also called with an empty payload right after (re)connecting,
+so caches resync anything they may have missed while disconnected.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable
+
+import psycopg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], None]
+
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def subscribe(channel: str, handler: Handler) -> None:
+    """Register a handler. Must be called before `start()`."""
+    with _lock:
+        if _thread is not None:
+            raise RuntimeError("notify listener already started")
+        _handlers[channel].append(handler)
+
+
+def start() -> None:
+    global _thread
+    with _lock:
+        if _thread is not None or not _handlers:
+            return
+        _thread = threading.Thread(target=_listen_forever, name="pg-notify", daemon=True)
+        _thread.start()
+
+
+def notify(db: Session, channel: str, payload: str = "") -> None:
+    """Queue a notification; Postgres delivers it when `db` commits."""
+    db.execute(select(func.pg_notify(channel, payload)))
+
+
+def _dsn() -> str:
+    # psycopg wants a plain libpq URL, not the SQLAlchemy "+psycopg" dialect form
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def _dispatch(channel: str, payload: str) -> None:
+    for handler in _handlers.get(channel, ()):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("notify handler failed for channel %s", channel)
+
+
+def _listen_forever() -> None:
+    while True:
+        try:
+            with psycopg.connect(_dsn(), autocommit=True) as conn:
+                for channel in _handlers:
+                    conn.execute(f'LISTEN "{channel}"')
+                for channel in _handlers:
+                    _dispatch(channel, "")
+                for n in conn.notifies():
+                    _dispatch(n.channel, n.payload)
+        except Exception:
+            logger.exception("notify listener disconnected; retrying")
+            time.sleep(1.0)
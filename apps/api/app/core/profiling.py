@@ -0,0 +1,292 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it carries `X-Profile: <ADMIN_TOKEN>` or is
+picked by PROFILE_SAMPLE_RATE. While any profiled request is in flight a
+sampler thread snapshots thread stacks each PROFILE_INTERVAL_MS. Endpoints
+are sync and run in threadpool threads; install() wraps each one so the
+thread running it registers itself with the request's profile for the
+duration of the call, and only registered threads are sampled, so
+concurrent requests stay out of each other's flamegraphs. Dependencies and
+streamed response bodies run in separate pool calls and are not sampled.
+Wall time is split into SQL (cursor events), JSON rendering of the response
+body and the remaining Python time (which includes response-model
+validation).
+The last PROFILE_KEEP profiles are served by the /admin/profiles routes.
+
+Nothing here is installed unless profiling is configured, so a disabled
+deployment pays nothing for it.
+"""
+import functools
+import inspect
+import itertools
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Request
+from fastapi.routing import APIRoute
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.querybudget import query_budget
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_DEPTH = 64
+
+_ids = itertools.count(1)
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_profiles: deque["RequestProfile"] = deque(maxlen=settings.PROFILE_KEEP)
+
+
+def enabled() -> bool:
+    return settings.PROFILE_SAMPLE_RATE > 0 or bool(settings.ADMIN_TOKEN)
+
+
+@dataclass(eq=False)
+class RequestProfile:
+    id: int
+    method: str
+    path: str
+    started_at: datetime
+    status: Optional[int] = None
+    wall_ms: float = 0.0
+    sql_ms: float = 0.0
+    sql_count: int = 0
+    render_ms: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+
+    @property
+    def python_ms(self) -> float:
+        return max(0.0, self.wall_ms - self.sql_ms - self.render_ms)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_ms": round(self.wall_ms, 3),
+            "sql_ms": round(self.sql_ms, 3),
+            "sql_count": self.sql_count,
+            "render_ms": round(self.render_ms, 3),
+            "python_ms": round(self.python_ms, 3),
+            "samples": sum(self.samples.values()),
+        }
+
+    def detail(self, top: int = 50) -> dict[str, Any]:
+        leaves: Counter = Counter()
+        for stack, n in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        return {
+            **self.summary(),
+            "interval_ms": settings.PROFILE_INTERVAL_MS,
+            "top_frames": leaves.most_common(top),
+            # Brendan Gregg "collapsed" format: feed straight into flamegraph.pl / speedscope
+            "stacks": [f"{stack} {n}" for stack, n in self.samples.most_common()],
+        }
+
+
+class _Sampler:
+    def __init__(self) -> None:
+        self._active: set[RequestProfile] = set()
+        # thread ident -> profile of the endpoint that thread is running
+        self._threads: dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.discard(profile)
+
+    def attach(self, ident: int, profile: RequestProfile) -> None:
+        with self._lock:
+            self._threads[ident] = profile
+
+    def detach(self, ident: int) -> None:
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def _run(self) -> None:
+        interval = settings.PROFILE_INTERVAL_MS / 1000.0
+        while True:
+            with self._lock:
+                active = list(self._active)
+                threads = list(self._threads.items())
+                if not active:
+                    self._wake.clear()
+            if not active:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for ident, profile in threads:
+                frame = frames.get(ident)
+                if frame is None or profile not in active:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    profile.samples[stack] += 1
+            time.sleep(interval)
+
+
+def _collapse(frame) -> Optional[str]:
+    frames = []
+    while frame is not None and len(frames) < MAX_DEPTH:
+        code = frame.f_code
+        frames.append((code.co_filename, code.co_name, frame.f_lineno))
+        frame = frame.f_back
+    frames.reverse()
+    # Start at the first frame in our own code; stacks that never enter it are idle workers
+    for i, (filename, _, _) in enumerate(frames):
+        if filename.startswith(APP_DIR):
+            break
+    else:
+        return None
+    return ";".join(f"{os.path.basename(f)}:{name}:{line}" for f, name, line in frames[i:])
+
+
+_sampler = _Sampler()
+
+
+def _register_thread(call):
+    """Wrap a sync endpoint so the pool thread running it is sampled for its request."""
+
+    @functools.wraps(call)
+    def endpoint(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        ident = threading.get_ident()
+        _sampler.attach(ident, profile)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _sampler.detach(ident)
+
+    return endpoint
+
+
+def _api_routes(routes):
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        elif hasattr(route, "original_router"):
+            # Newer FastAPI keeps included routers nested instead of copying their routes
+            yield from _api_routes(route.original_router.routes)
+
+
+class ProfiledJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        profile = _current.get()
+        if profile is None:
+            return super().render(content)
+        t0 = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            profile.render_ms += (time.perf_counter() - t0) * 1000.0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is not None and conn.info.get("profile_t0"):
+        profile.sql_ms += (time.perf_counter() - conn.info["profile_t0"].pop()) * 1000.0
+        profile.sql_count += 1
+
+
+def _wants_profile(request: Request) -> bool:
+    token = request.headers.get("x-profile")
+    if token and settings.ADMIN_TOKEN and secrets.compare_digest(token, settings.ADMIN_TOKEN):
+        return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+async def profiling_middleware(request: Request, call_next):
+    if not _wants_profile(request):
+        return await call_next(request)
+
+    profile = RequestProfile(
+        id=next(_ids),
+        method=request.method,
+        path=request.url.path,
+        started_at=datetime.now(timezone.utc),
+    )
+    token = _current.set(profile)
+    _sampler.add(profile)
+    t0 = time.perf_counter()
+    try:
+        response = await call_next(request)
+        profile.status = response.status_code
+        response.headers["X-Profile-Id"] = str(profile.id)
+        return response
+    finally:
+        profile.wall_ms = (time.perf_counter() - t0) * 1000.0
+        _sampler.remove(profile)
+        _current.reset(token)
+        _profiles.append(profile)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not settings.ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@admin_router.get("/profiles", dependencies=[Depends(require_admin)])
+@query_budget(0)
+def list_profiles():
+    return [p.summary() for p in reversed(_profiles)]
+
+
+@admin_router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+@query_budget(0)
+def get_profile(profile_id: int, top: int = 50):
+    for p in _profiles:
+        if p.id == profile_id:
+            return p.detail(top)
+    raise HTTPException(status_code=404, detail="Profile not found")
+
+
+def install(app: FastAPI, engines) -> None:
+    """Wire profiling into `app`; call only when `enabled()`."""
+    for engine in {id(e): e for e in engines}.values():
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.middleware("http")(profiling_middleware)
+    app.include_router(admin_router)
+    for route in _api_routes(app.routes):
+        if inspect.iscoroutinefunction(route.endpoint):
+            continue
+        wrapped = _register_thread(route.endpoint)
+        # Routes on included routers build their handler from `endpoint` on
+        # first use; routes already built call `dependant.call` per request
+        route.endpoint = wrapped
+        route.dependant.call = wrapped
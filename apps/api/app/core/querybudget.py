@@ -0,0 +1,85 @@
+"""
+Per-route SQL statement budgets and a recorder to check them.
+
+Routes declare the most statements one request may issue with
+`@query_budget(n)` (placed under the router decorator). The harness in
+app.cli.query_budget records statements through SQLAlchemy cursor events
+and fails a route that goes over its budget.
+"""
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+# The recorder that statements issued in the current context belong to.
+# Endpoints run in a copy of the caller's context (threadpool included), so a
+# recorder entered around a TestClient call sees that request and nothing else.
+_active: ContextVar[Optional["StatementRecorder"]] = ContextVar("statement_recorder", default=None)
+
+
+def query_budget(n: int) -> Callable[[F], F]:
+    def decorate(fn: F) -> F:
+        fn.query_budget = n  # type: ignore[attr-defined]
+        return fn
+
+    return decorate
+
+
+def budget_of(endpoint: Callable[..., Any]) -> Optional[int]:
+    return getattr(endpoint, "query_budget", None)
+
+
+@dataclass
+class RecordedStatement:
+    engine: Engine
+    statement: str
+    parameters: Any
+    executemany: bool
+    thread: str
+
+
+@dataclass
+class StatementRecorder:
+    """Context manager collecting statements sent through `engines`.
+
+    Only statements issued from the context that entered the recorder (or a
+    copy of it, such as a request handled in that context) are recorded;
+    background threads and other requests don't count.
+    """
+
+    engines: Iterable[Engine]
+    statements: list[RecordedStatement] = field(default_factory=list)
+
+    def _listener(self, engine: Engine):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _active.get() is self:
+                self.statements.append(
+                    RecordedStatement(
+                        engine, statement, parameters, executemany, threading.current_thread().name
+                    )
+                )
+
+        return before_cursor_execute
+
+    def __enter__(self) -> "StatementRecorder":
+        self._hooks = []
+        for engine in {id(e): e for e in self.engines}.values():
+            hook = self._listener(engine)
+            event.listen(engine, "before_cursor_execute", hook)
+            self._hooks.append((engine, hook))
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _active.reset(self._token)
+        for engine, hook in self._hooks:
+            event.remove(engine, "before_cursor_execute", hook)
+
+    def __len__(self) -> int:
+        return len(self.statements)
@@ -0,0 +1,87 @@
+"""
+In-process token-bucket rate limiting keyed on the JWT subject.
+
+Buckets live in one OrderedDict kept in last-touched order, so both the
+LRU cap and idle eviction pop from the front in O(1). A bucket that has
+been idle long enough to refill completely carries no state, so evicting
+it never lets a client through early. Limits are per worker process.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import settings
+from app.core.security import get_current_user_id
+
+
+class TokenBucketStore:
+    def __init__(self, max_keys: int, idle_seconds: float) -> None:
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        # key -> [tokens, last_refill_monotonic]
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: Hashable, rate: float, burst: int) -> float:
+        """Spend one token; return 0.0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(burst)
+                bucket = self._buckets[key] = [tokens, now]
+            else:
+                tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rate
+            bucket[0] = tokens
+            bucket[1] = now
+
+            self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+        cutoff = now - self.idle_seconds
+        while buckets:
+            _, (_, last) = next(iter(buckets.items()))
+            if last > cutoff:
+                break
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_store = TokenBucketStore(
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    idle_seconds=settings.RATE_LIMIT_IDLE_SECONDS,
+)
+
+
+def rate_limit(name: str, rate: float, burst: int) -> Callable[..., None]:
+    """Dependency allowing `rate` requests/second per user on a route, bursting to `burst`."""
+
+    async def dependency(user_id: str = Depends(get_current_user_id)) -> None:
+        if not settings.RATE_LIMIT_ENABLED or rate <= 0:
+            return
+        wait = _store.take((name, user_id), rate, burst)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
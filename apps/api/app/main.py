@@ -1,12 +1,86 @@
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.routes.auth import router as auth_router
 from app.api.routes.me import router as me_router
 from app.api.routes.trading import router as trading_router
 from app.api.routes.market import router as market_router
+from app.api.routes.export import router as export_router
+from app.core import notify, profiling
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, engine as db_engine, read_engine
+from app.core.querybudget import query_budget
+from app.market.tickbuffer import tick_store
+from app.services import state_versions
+from app.services.instruments import instruments
+from app.services.sequencer import sequencer
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine_lock = None
+    if settings.MARKET_ENGINE_MODE == "embedded":
+        from app.market.embedded import try_engine_lock
+
+        # With several workers only one may run the engine; the rest follow it
+        engine_lock = await asyncio.to_thread(try_engine_lock)
+        if engine_lock is None:
+            logger.info("[market] embedded engine runs in another worker; following its ticks")
+    embedded = engine_lock is not None
+
+    instruments.listen()
+    state_versions.listen()
+    if not embedded:
+        tick_store.listen()
+    notify.start()
+    try:
+        instruments.reload()
+    except Exception:
+        # The notify listener reloads again as soon as it can reach the DB
+        logger.exception("initial instrument load failed")
+
+    engine = None
+    if embedded:
+        from app.market.embedded import EmbeddedEngine
+
+        # The engine feeds the ring buffers directly; fill them once up front
+        db = ReadSessionLocal()
+        try:
+            tick_store.fill(db)
+        finally:
+            db.close()
+        engine = EmbeddedEngine(persist_every=settings.MARKET_PERSIST_EVERY)
+        await engine.start()
 
-app = FastAPI(title="Stock Broker App (Paper Trading)")
+    if settings.ORDER_SEQUENCER_ENABLED:
+        sequencer.start()
+
+    yield
+
+    if settings.ORDER_SEQUENCER_ENABLED:
+        await asyncio.to_thread(sequencer.stop)
+    if engine is not None:
+        await engine.stop()
+    if engine_lock is not None:
+        from app.market.embedded import release_engine_lock
+
+        release_engine_lock(engine_lock)
+
+
+app = FastAPI(
+    title="Stock Broker App (Paper Trading)",
+    lifespan=lifespan,
+    default_response_class=(
+        profiling.ProfiledJSONResponse if profiling.enabled() else JSONResponse
+    ),
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,7 +97,12 @@ app.include_router(auth_router)
 app.include_router(me_router)
 app.include_router(trading_router)
 app.include_router(market_router)
+app.include_router(export_router)
+
+if profiling.enabled():
+    profiling.install(app, [db_engine, read_engine])
 
 @app.get("/health")
+@query_budget(0)
 def health():
     return {"status": "ok"}
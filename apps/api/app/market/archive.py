@@ -0,0 +1,168 @@
+"""
+Columnar on-disk archive for cold market ticks.
+
+    {TICK_ARCHIVE_DIR}/{SYMBOL}/{YYYY-MM-DD}.npy   float64, shape (2, n)
+        row 0  epoch seconds, ascending
+        row 1  price
+
+One plain .npy file per symbol and UTC day, written by app.cli.archive,
+which then deletes those rows from market_ticks. Both columns live in the
+one file, so a day is replaced atomically and can't end up with columns of
+different lengths. Readers open it with np.load(mmap_mode="r"); each row is
+C-contiguous, so a day is a zero-copy view backed by the page cache and only
+the slices a request touches are ever read.
+
+For each symbol, everything before `archived_until()` lives here and
+Postgres holds the rest; readers clip their SQL at that boundary, which also
+keeps them correct if the archiver stopped between writing and deleting.
+"""
+import os
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+_EMPTY = np.empty(0, np.float64)
+_DAY_FILE = re.compile(r"\d{4}-\d{2}-\d{2}\.npy")
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, timezone.utc)
+
+
+def as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """Naive datetimes are taken as UTC, like the DB session does."""
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+class TickArchive:
+    def __init__(self, root: Optional[str]) -> None:
+        self.root = Path(root) if root else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def _path(self, symbol: str, day: date) -> Path:
+        return self.root / symbol / f"{day.isoformat()}.npy"
+
+    def symbols(self) -> list[str]:
+        if self.root is None:
+            return []
+        try:
+            return sorted(e.name for e in os.scandir(self.root) if e.is_dir())
+        except FileNotFoundError:
+            return []
+
+    def days(self, symbol: str) -> list[date]:
+        if self.root is None:
+            return []
+        try:
+            names = os.listdir(self.root / symbol)
+        except FileNotFoundError:
+            return []
+        return sorted(date.fromisoformat(n[:-4]) for n in names if _DAY_FILE.fullmatch(n))
+
+    def archived_until(self, symbol: str) -> Optional[datetime]:
+        """End of the last archived day; ticks before it are read from here."""
+        days = self.days(symbol)
+        return day_start(days[-1] + timedelta(days=1)) if days else None
+
+    def split(self, symbol: str, since: Optional[datetime]) -> Optional[datetime]:
+        """
+        The archive boundary if a range starting at `since` reaches into the
+        archive (read the archive up to it and SQL from it), else None.
+        """
+        boundary = self.archived_until(symbol)
+        if boundary is None or (since is not None and as_utc(since) >= boundary):
+            return None
+        return boundary
+
+    def open_day(self, symbol: str, day: date) -> tuple[np.ndarray, np.ndarray]:
+        path = self._path(symbol, day)
+        cols = np.load(path, mmap_mode="r")
+        if cols.ndim != 2 or cols.shape[0] != 2 or cols.dtype != np.float64:
+            raise ValueError(f"{path}: expected float64 (2, n), got {cols.dtype} {cols.shape}")
+        return cols[0], cols[1]
+
+    def write_day(self, symbol: str, day: date, ts: np.ndarray, price: np.ndarray) -> int:
+        """Store one day, merging with what is already archived; returns the tick count."""
+        if len(ts) != len(price):
+            raise ValueError(f"{symbol} {day}: {len(ts)} timestamps but {len(price)} prices")
+        path = self._path(symbol, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            old_ts, old_price = self.open_day(symbol, day)
+            ts = np.concatenate([old_ts, ts])
+            price = np.concatenate([old_price, price])
+            # A rerun after an interrupted delete sees the same ticks again
+            ts, first = np.unique(ts, return_index=True)
+            price = price[first]
+        # Write aside and rename so readers never map a half-written file
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.stack([ts, price]).astype(np.float64, copy=False))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return len(ts)
+
+    def segments(
+        self,
+        symbol: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        reverse: bool = False,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Zero-copy (ts, price) views per archived day overlapping [since, until)."""
+        lo = as_utc(since).timestamp() if since is not None else -np.inf
+        hi = as_utc(until).timestamp() if until is not None else np.inf
+        days = self.days(symbol)
+        for day in reversed(days) if reverse else days:
+            start = day_start(day).timestamp()
+            if start >= hi or start + 86400 <= lo:
+                continue
+            ts, price = self.open_day(symbol, day)
+            i, j = np.searchsorted(ts, [lo, hi], side="left")
+            if j > i:
+                yield ts[i:j], price[i:j]
+
+    def load(
+        self,
+        symbol: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(ts, price) for [since, until); a single day comes back as a view, not a copy."""
+        parts = list(self.segments(symbol, since, until))
+        if not parts:
+            return _EMPTY, _EMPTY
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def tail(
+        self,
+        symbol: str,
+        n: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> np.ndarray:
+        """Last n archived prices in [since, until), oldest -> newest, touching only the days needed."""
+        parts: list[np.ndarray] = []
+        need = n
+        for _, price in self.segments(symbol, since, until, reverse=True):
+            if need <= 0:
+                break
+            parts.append(price[-need:])
+            need -= len(parts[-1])
+        return np.concatenate(parts[::-1]) if parts else _EMPTY
+
+
+tick_archive = TickArchive(settings.TICK_ARCHIVE_DIR)
@@ -0,0 +1,98 @@
+"""
+Shape-preserving downsampling for price charts.
+
+Min/max per bucket: the series is cut into points // 2 equal-width buckets
+and each bucket contributes its lowest and highest sample in their original
+order, so spikes survive however long the range is. One vectorized pass,
+no Python loop over samples.
+
+TimeBuckets does the same over equal-width time buckets, fed piecewise
+(archived days, then per-bucket extremes computed by Postgres) so a long
+range never has to be held in memory at once.
+"""
+import numpy as np
+
+
+def minmax_indices(values: np.ndarray, points: int) -> np.ndarray:
+    """Ascending indices of at most `points` samples to keep."""
+    n = len(values)
+    if n <= points:
+        return np.arange(n)
+
+    buckets = max(1, points // 2)
+    starts = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(starts, n)))
+    idx = np.arange(n)
+
+    lo = np.minimum.reduceat(values, starts)
+    hi = np.maximum.reduceat(values, starts)
+    # First position of each bucket's min / max
+    lo_at = np.minimum.reduceat(np.where(values == lo[bucket_of], idx, n), starts)
+    hi_at = np.minimum.reduceat(np.where(values == hi[bucket_of], idx, n), starts)
+
+    pairs = np.sort(np.stack([lo_at, hi_at], axis=1), axis=1).ravel()
+    # Flat buckets yield the same index twice
+    keep = np.ones(len(pairs), dtype=bool)
+    keep[1:] = pairs[1:] != pairs[:-1]
+    return pairs[keep]
+
+
+def minmax(values: np.ndarray, points: int) -> np.ndarray:
+    return values[minmax_indices(values, points)]
+
+
+class TimeBuckets:
+    """Running min/max per equal-width time bucket over [lo, hi) epoch seconds."""
+
+    def __init__(self, lo: float, hi: float, buckets: int) -> None:
+        self.lo = lo
+        self.buckets = max(1, buckets)
+        self.width = max((hi - lo) / self.buckets, 1e-6)
+        self.lo_v = np.full(self.buckets, np.inf)
+        self.lo_t = np.full(self.buckets, np.nan)
+        self.hi_v = np.full(self.buckets, -np.inf)
+        self.hi_t = np.full(self.buckets, np.nan)
+
+    def bucket(self, ts: np.ndarray) -> np.ndarray:
+        k = np.floor((np.asarray(ts, dtype=np.float64) - self.lo) / self.width)
+        return np.clip(k, 0, self.buckets - 1).astype(np.int64)
+
+    def add_extremes(self, k, lo_t, lo_v, hi_t, hi_v) -> None:
+        """Merge per-bucket extremes; feed oldest data first so ties keep the earliest sample."""
+        k = np.asarray(k, dtype=np.int64)
+        lo_v = np.asarray(lo_v, dtype=np.float64)
+        hi_v = np.asarray(hi_v, dtype=np.float64)
+        better = lo_v < self.lo_v[k]
+        self.lo_v[k[better]] = lo_v[better]
+        self.lo_t[k[better]] = np.asarray(lo_t, dtype=np.float64)[better]
+        better = hi_v > self.hi_v[k]
+        self.hi_v[k[better]] = hi_v[better]
+        self.hi_t[k[better]] = np.asarray(hi_t, dtype=np.float64)[better]
+
+    def add(self, ts: np.ndarray, values: np.ndarray) -> None:
+        """Fold in a run of samples with ascending timestamps."""
+        n = len(ts)
+        if n == 0:
+            return
+        k = self.bucket(ts)
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        run_of = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+        idx = np.arange(n)
+        lo = np.minimum.reduceat(values, starts)
+        hi = np.maximum.reduceat(values, starts)
+        lo_at = np.minimum.reduceat(np.where(values == lo[run_of], idx, n), starts)
+        hi_at = np.minimum.reduceat(np.where(values == hi[run_of], idx, n), starts)
+        self.add_extremes(k[starts], ts[lo_at], lo, ts[hi_at], hi)
+
+    def values(self) -> np.ndarray:
+        """Each bucket's min and max in time order, at most 2 * buckets values."""
+        seen = ~np.isnan(self.lo_t)
+        t = np.stack([self.lo_t[seen], self.hi_t[seen]], axis=1)
+        v = np.stack([self.lo_v[seen], self.hi_v[seen]], axis=1)
+        order = np.argsort(t, axis=1, kind="stable")
+        t = np.take_along_axis(t, order, axis=1).ravel()
+        v = np.take_along_axis(v, order, axis=1).ravel()
+        # A flat bucket has the same sample as both min and max
+        keep = np.ones(len(t), dtype=bool)
+        keep[1:] = (t[1:] != t[:-1]) | (v[1:] != v[:-1])
+        return v[keep]
@@ -0,0 +1,209 @@
+"""
+Market engine as an asyncio task inside the API process.
+
+Prices live in memory and go straight to the quote cache and the tick ring
+buffers; Postgres is written from a separate writer task, so a slow commit
+never delays a tick. market_prices is upserted every tick, since the other
+workers price fills and quotes from it; market_ticks rows go in batches,
+and other processes see the `market_tick` notification after each batch
+lands. The price board is published after the commit, as in the standalone
+engine.
+
+Only one API worker runs the engine: whichever takes the Postgres advisory
+lock first. The others follow its persisted ticks exactly as they would
+follow the standalone engine.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Connection, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core import notify
+from app.core.database import SessionLocal, engine
+from app.core.money import ticks_to_decimal, ticks_to_float, to_ticks
+from app.market.engine import STATS_EVERY, TICK_POLICY, TICK_SECONDS, round_to_tick, step
+from app.market.priceboard import price_board
+from app.market.scheduler import TickScheduler
+from app.market.tickbuffer import tick_store
+from app.models.market_price import MarketPrice
+from app.models.market_tick import MarketTick
+from app.services import quotes
+from app.services.instruments import instruments
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock held by the one worker that runs the engine
+ENGINE_LOCK_KEY = 0x6D6B7421
+
+Batch = list[tuple[str, int, datetime]]
+Latest = dict[str, tuple[int, datetime]]
+
+
+def persist(batch: Batch, latest: Latest) -> None:
+    """Insert `batch` into market_ticks (may be empty) and upsert `latest` prices."""
+    db = SessionLocal()
+    try:
+        if batch:
+            db.execute(
+                insert(MarketTick),
+                [{"symbol": s, "price": ticks_to_decimal(p), "ts": t} for s, p, t in batch],
+            )
+            notify.notify(db, "market_tick")
+        if latest:
+            stmt = pg_insert(MarketPrice).values(
+                [
+                    {"symbol": s, "price": ticks_to_decimal(p), "updated_at": t}
+                    for s, (p, t) in latest.items()
+                ]
+            )
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[MarketPrice.symbol],
+                    set_={"price": stmt.excluded.price, "updated_at": stmt.excluded.updated_at},
+                )
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    # After the commit, so a board quote is never ahead of the DB
+    for symbol, (price, ts) in latest.items():
+        price_board.publish(symbol, price, ts.timestamp())
+
+
+def try_engine_lock() -> Optional[Connection]:
+    """
+    Take the engine lock for this worker, or None if another one holds it.
+    Hold on to the returned connection and give it to release_engine_lock().
+    """
+    conn = engine.connect()
+    try:
+        got = conn.scalar(select(func.pg_try_advisory_lock(ENGINE_LOCK_KEY)))
+        conn.commit()
+    except Exception:
+        conn.close()
+        raise
+    if not got:
+        conn.close()
+        return None
+    return conn
+
+
+def release_engine_lock(conn: Connection) -> None:
+    # Closing alone would hand the session, lock included, back to the pool
+    try:
+        conn.scalar(select(func.pg_advisory_unlock(ENGINE_LOCK_KEY)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class EmbeddedEngine:
+    def __init__(
+        self,
+        tick_seconds: float = TICK_SECONDS,
+        persist_every: int = 5,
+        policy: str = TICK_POLICY,
+    ) -> None:
+        self.tick_seconds = tick_seconds
+        self.persist_every = max(1, persist_every)
+        self.scheduler = TickScheduler(tick_seconds, policy=policy)
+        self.prices: dict[str, int] = {}  # ticks
+        self._pending: Batch = []
+        self._latest: Latest = {}
+        self._queue: asyncio.Queue[tuple[Batch, Latest]] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    def load(self) -> None:
+        db = SessionLocal()
+        try:
+            rows = db.execute(select(MarketPrice.symbol, MarketPrice.price)).all()
+        finally:
+            db.close()
+        self.prices = {s: to_ticks(p) for s, p in rows}
+        now = datetime.now(timezone.utc)
+        for symbol, price in self.prices.items():
+            quotes.publish(symbol, price, now)
+
+    def tick(self, ts: float) -> None:
+        now = datetime.fromtimestamp(ts, timezone.utc)
+        for spec in instruments.active():
+            price = self.prices.get(spec.symbol)
+            if price is None:
+                new_price = round_to_tick(spec.start_price, spec.tick_size)
+            else:
+                new_price = step(spec, price)
+            self.prices[spec.symbol] = new_price
+            quotes.publish(spec.symbol, new_price, now)
+            self._latest[spec.symbol] = (new_price, now)
+            tick_store.append(spec.symbol, ts, ticks_to_float(new_price))
+            self._pending.append((spec.symbol, new_price, now))
+
+    def _flush(self, ticks: bool = True) -> None:
+        batch: Batch = []
+        if ticks:
+            batch, self._pending = self._pending, []
+        if batch or self._latest:
+            self._queue.put_nowait((batch, self._latest))
+            self._latest = {}
+
+    async def _tick_loop(self) -> None:
+        n = 0
+        while True:
+            tick = await self.scheduler.wait_async()
+            if tick.missed:
+                logger.warning(
+                    "[market] overrun: %s %d tick(s), lag=%.3fs",
+                    self.scheduler.policy, tick.missed, tick.lag,
+                )
+            try:
+                self.tick(tick.scheduled)
+            except Exception:
+                logger.exception("[market] embedded tick failed")
+            n += 1
+            self._flush(ticks=n % self.persist_every == 0)
+            if STATS_EVERY and n % STATS_EVERY == 0:
+                logger.info("[market] scheduler: %s", self.scheduler.summary())
+
+    async def _writer(self) -> None:
+        while True:
+            batch, latest = await self._queue.get()
+            taken = 1
+            # Behind? Write everything queued in one transaction
+            while not self._queue.empty():
+                more, newer = self._queue.get_nowait()
+                batch = batch + more
+                latest = {**latest, **newer}
+                taken += 1
+            try:
+                await asyncio.to_thread(persist, batch, latest)
+            except Exception:
+                logger.exception("[market] failed to persist %d ticks", len(batch))
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    async def start(self) -> None:
+        price_board.open_writer()
+        await asyncio.to_thread(self.load)
+        self._tasks = [
+            asyncio.create_task(self._tick_loop(), name="market-ticks"),
+            asyncio.create_task(self._writer(), name="market-writer"),
+        ]
+        logger.info(
+            "[market] embedded engine started: tick=%ss policy=%s",
+            self.tick_seconds, self.scheduler.policy,
+        )
+
+    async def stop(self) -> None:
+        ticker, writer = self._tasks
+        ticker.cancel()
+        self._flush()
+        await self._queue.join()
+        writer.cancel()
+        await asyncio.gather(ticker, writer, return_exceptions=True)
@@ -1,88 +1,106 @@
+import math
 import os
-import time
 import random
-from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime, timezone
 
 from sqlalchemy import select
 
+from app.core import notify
 from app.core.database import SessionLocal
+from app.core.money import PRICE_SCALE, div_half_up, ticks_to_decimal, to_ticks
+from app.market.priceboard import price_board
+from app.market.scheduler import TickScheduler
 from app.models.market_price import MarketPrice
 from app.models.market_tick import MarketTick
-
-# Keep in sync with frontend VALID_SYMBOLS
-SYMBOLS: dict[str, Decimal] = {
-    "AAPL": Decimal("185.00"),
-    "MSFT": Decimal("410.00"),
-    "TSLA": Decimal("240.00"),
-    "AMZN": Decimal("170.00"),
-    "GOOGL": Decimal("145.00"),
-    "NVDA": Decimal("600.00"),
-}
-
-VOL: dict[str, Decimal] = {
-    "AAPL": Decimal("0.0020"),
-    "MSFT": Decimal("0.0018"),
-    "TSLA": Decimal("0.0060"),
-    "AMZN": Decimal("0.0025"),
-    "GOOGL": Decimal("0.0022"),
-    "NVDA": Decimal("0.0050"),
-}
+from app.services.instruments import InstrumentSpec, instruments
 
 TICK_SECONDS = float(os.getenv("MARKET_TICK_SECONDS", "2.0"))
+# What to do with ticks whose slot passed during an overrun: skip | catch_up | coalesce
+TICK_POLICY = os.getenv("MARKET_TICK_POLICY", "skip")
+# Log the scheduler's lag/missed-tick stats every this many ticks (0 = never)
+STATS_EVERY = int(os.getenv("MARKET_STATS_EVERY", "150"))
+
+DRIFT = 0.00005
 
 
-def q4(x: Decimal) -> Decimal:
-    return x.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+def round_to_tick(ticks: int, tick_size: int) -> int:
+    """Snap a price in ticks to the instrument's tick size (both in 0.0001 units)."""
+    if tick_size <= 1:
+        return ticks
+    return div_half_up(ticks, tick_size) * tick_size
 
 
 def ensure_seed(db):
     """
-    Ensure each symbol has:
+    Ensure each active instrument has:
       - one MarketPrice row (latest price)
       - at least one MarketTick row (history)
     """
-    for sym, start_price in SYMBOLS.items():
-        row = db.get(MarketPrice, sym)
-        if row is None:
-            p = q4(start_price)
-            db.add(MarketPrice(symbol=sym, price=p))
-            db.add(MarketTick(symbol=sym, price=p))
+    existing = set(db.scalars(select(MarketPrice.symbol)).all())
+    for spec in instruments.active():
+        if spec.symbol not in existing:
+            p = ticks_to_decimal(round_to_tick(spec.start_price, spec.tick_size))
+            db.add(MarketPrice(symbol=spec.symbol, price=p))
+            db.add(MarketTick(symbol=spec.symbol, price=p))
     db.commit()
 
 
-def step(sym: str, price: Decimal) -> Decimal:
-    # Multiplicative random walk
-    vol = VOL.get(sym, Decimal("0.0020"))
-    drift = Decimal("0.00005")
-    z = Decimal(str(random.gauss(0, 1)))
-    change = drift + (vol * z)
-    new_price = price * (Decimal("1.0") + change)
+def step(spec: InstrumentSpec, price: int) -> int:
+    # Multiplicative random walk on integer ticks
+    change = DRIFT + spec.volatility * random.gauss(0, 1)
+    new_price = math.floor(price * (1.0 + change) + 0.5)
     if new_price <= 0:
-        new_price = Decimal("1.00")
-    return q4(new_price)
+        new_price = PRICE_SCALE  # 1.00
+    return max(round_to_tick(new_price, spec.tick_size), spec.tick_size)
 
 
 def run():
-    print(f"[market] starting: tick={TICK_SECONDS}s symbols={list(SYMBOLS.keys())}")
+    instruments.listen()
+    notify.start()
+    instruments.reload()
+    price_board.open_writer()
+    scheduler = TickScheduler(TICK_SECONDS, policy=TICK_POLICY)
+    print(
+        f"[market] starting: tick={TICK_SECONDS}s policy={TICK_POLICY} "
+        f"instruments={len(instruments.active())}"
+    )
+    n = 0
     while True:
+        tick = scheduler.wait()
+        if tick.missed:
+            print(f"[market] overrun: {TICK_POLICY} {tick.missed} tick(s), lag={tick.lag:.3f}s")
+        n += 1
+        if STATS_EVERY and n % STATS_EVERY == 0:
+            print(f"[market] scheduler: {scheduler.summary()}")
+        ts = datetime.fromtimestamp(tick.scheduled, timezone.utc)
+
         db = SessionLocal()
         try:
             ensure_seed(db)
 
+            published: list[tuple[str, int]] = []
             prices = db.execute(select(MarketPrice)).scalars().all()
             for mp in prices:
-                mp.price = step(mp.symbol, Decimal(mp.price))
-                db.add(MarketTick(symbol=mp.symbol, price=mp.price))
-
+                spec = instruments.get(mp.symbol)
+                if spec is None or not spec.active:
+                    continue
+                new_price = step(spec, to_ticks(mp.price))
+                mp.price = ticks_to_decimal(new_price)
+                mp.updated_at = ts
+                db.add(MarketTick(symbol=mp.symbol, price=mp.price, ts=ts))
+                published.append((mp.symbol, new_price))
+
+            notify.notify(db, "market_tick")
             db.commit()
+            # After the commit, so a board quote is never ahead of the DB
+            for symbol, new_price in published:
+                price_board.publish(symbol, new_price, tick.scheduled)
         except Exception as e:
             db.rollback()
             print("[market] error:", e)
         finally:
             db.close()
 
-        time.sleep(TICK_SECONDS)
-
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,94 @@
+"""
+Downsampled price history over an arbitrary time range.
+
+The range is cut into points // 2 equal-width time buckets. Archived days
+are folded in one memory-mapped day at a time; for the rows still in
+market_ticks Postgres picks each bucket's min and max itself, so at most
+`points` rows cross the wire and nothing is held per tick, however long the
+range.
+"""
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.market.archive import as_utc, tick_archive
+from app.market.downsample import TimeBuckets
+
+EXTREMES_SQL = text("""
+WITH t AS (
+    SELECT id, ts, price, extract(epoch FROM ts)::float8 AS epoch
+    FROM market_ticks
+    WHERE symbol = :symbol
+      AND (CAST(:lower AS timestamptz) IS NULL OR ts >= :lower)
+      AND (CAST(:until AS timestamptz) IS NULL OR ts < :until)
+), bounds AS (
+    SELECT coalesce(CAST(:lo AS float8), min(epoch)) AS lo FROM t
+), b AS (
+    SELECT t.id, t.ts, t.price, t.epoch,
+           least(greatest(floor((t.epoch - bounds.lo)
+                 / greatest((:hi - bounds.lo) / :buckets, 1e-6)), 0), :buckets - 1)::int AS k
+    FROM t, bounds
+)
+(SELECT DISTINCT ON (k) k, epoch, price::float8, false AS is_max FROM b ORDER BY k, price, ts, id)
+UNION ALL
+(SELECT DISTINCT ON (k) k, epoch, price::float8, true FROM b ORDER BY k, price DESC, ts, id)
+""")
+
+
+def range_minmax(
+    db: Session,
+    symbol: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    points: int,
+) -> list[float]:
+    """Min/max per time bucket over [since, until), oldest -> newest; one SQL statement."""
+    buckets = max(1, points // 2)
+    hi = as_utc(until).timestamp() if until is not None else time.time()
+    boundary = tick_archive.split(symbol, since)
+
+    # The lower edge: `since`, else the oldest archived tick, else Postgres' oldest row
+    lo = as_utc(since).timestamp() if since is not None else None
+    segments = tick_archive.segments(symbol, since, until) if boundary is not None else iter(())
+    first = next(segments, None)
+    if lo is None and first is not None:
+        lo = float(first[0][0])
+
+    rows = db.execute(
+        EXTREMES_SQL,
+        {
+            "symbol": symbol,
+            "lower": boundary or since,  # older rows come from the archive
+            "until": until,
+            "lo": lo,
+            "hi": hi,
+            "buckets": buckets,
+        },
+    ).all()
+    if lo is None:
+        if not rows:
+            return []
+        lo = min(r[1] for r in rows)  # what Postgres used: its oldest row
+
+    tb = TimeBuckets(lo, hi, buckets)
+    if first is not None:
+        tb.add(*first)
+    for ts, price in segments:
+        tb.add(ts, price)
+    if rows:
+        k, epoch, price, is_max = (np.array(c) for c in zip(*rows))
+        mins, maxs = ~is_max.astype(bool), is_max.astype(bool)
+        # Postgres returns a min and a max row for every bucket it has
+        order_min, order_max = np.argsort(k[mins]), np.argsort(k[maxs])
+        tb.add_extremes(
+            k[mins][order_min],
+            epoch[mins][order_min],
+            price[mins][order_min],
+            epoch[maxs][order_max],
+            price[maxs][order_max],
+        )
+    return tb.values().tolist()
@@ -0,0 +1,183 @@
+"""
+Latest price per symbol in a named shared-memory segment.
+
+The market engine is the only writer; every API worker maps the same
+segment and reads it in place, so quotes cost neither a DB round trip nor a
+per-worker cache fed by its own notification listener.
+
+Layout (little endian, fixed):
+
+    header  magic "PBRD" | version u32 | slots u32
+    slot    seq u64 | symbol 16s | price ticks i64 | ts f64 epoch seconds
+
+Each slot is a seqlock: the writer makes seq odd, writes the fields, then
+makes it even again. A reader takes the whole slot in one unpack and checks
+that seq was even and unchanged afterwards, otherwise it retries. Symbols
+claim slots in first-publish order and never move.
+
+The segment outlives the engine (it is never unlinked) so a restarted
+engine picks up the same board and readers keep their mapping.
+"""
+import logging
+import struct
+import time
+from datetime import datetime, timezone
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PBRD"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+SLOT = struct.Struct("<Q16sqd")
+SEQ = struct.Struct("<Q")
+READ_RETRIES = 8
+ATTACH_RETRY_SECONDS = 1.0
+
+
+def _open(name: str, size: int, create: bool) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+    # The resource tracker would unlink the segment when this process exits,
+    # pulling it from under every other process that has it mapped.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class PriceBoard:
+    def __init__(self, name: Optional[str], slots: int = 1024, max_age: float = 5.0) -> None:
+        self.name = name
+        self.slots = slots
+        self.max_age = max_age
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._buf: Optional[memoryview] = None
+        self._index: dict[str, int] = {}
+        self._next_attach = 0.0
+        self._next_rescan = 0.0
+
+    @property
+    def size(self) -> int:
+        return HEADER.size + self.slots * SLOT.size
+
+    def _offset(self, slot: int) -> int:
+        return HEADER.size + slot * SLOT.size
+
+    def _map(self, shm: shared_memory.SharedMemory) -> None:
+        self._shm = shm
+        self._buf = shm.buf
+        self._rescan()
+
+    def _stable(self, slot: int) -> Optional[tuple[int, bytes, int, float]]:
+        """Consistent copy of a slot, or None if the writer kept it busy."""
+        off = self._offset(slot)
+        for _ in range(READ_RETRIES):
+            fields = SLOT.unpack_from(self._buf, off)
+            if not fields[0] & 1 and SEQ.unpack_from(self._buf, off)[0] == fields[0]:
+                return fields
+        return None
+
+    def _rescan(self) -> None:
+        index = {}
+        for i in range(self.slots):
+            fields = self._stable(i)
+            if fields is None:
+                continue
+            if fields[0] == 0:
+                break  # slots are claimed in order
+            index[fields[1].rstrip(b"\0").decode()] = i
+        self._index = index
+
+    # -- writer (market engine) --
+
+    def open_writer(self) -> bool:
+        """Create the segment, or take over an existing one. False if disabled."""
+        if not self.name:
+            return False
+        try:
+            shm = _open(self.name, self.size, create=True)
+            HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, self.slots)
+        except FileExistsError:
+            shm = _open(self.name, self.size, create=False)
+            magic, version, slots = HEADER.unpack_from(shm.buf, 0)
+            if (magic, version) != (MAGIC, VERSION):
+                raise RuntimeError(f"shared memory {self.name!r} is not a v{VERSION} price board")
+            self.slots = slots
+        self._map(shm)
+        logger.info("price board %r: %d slots, %d in use", self.name, self.slots, len(self._index))
+        return True
+
+    def publish(self, symbol: str, price: int, ts: float) -> None:
+        if self._buf is None:
+            return
+        slot = self._index.get(symbol)
+        if slot is None:
+            if len(self._index) >= self.slots:
+                logger.warning("price board full (%d slots); %s not published", self.slots, symbol)
+                return
+            slot = self._index[symbol] = len(self._index)
+        off = self._offset(slot)
+        # A writer that died mid-publish left seq odd; round up to even so
+        # readers see this write as in progress and then as stable again
+        seq = (SEQ.unpack_from(self._buf, off)[0] + 1) & ~1
+        SEQ.pack_into(self._buf, off, seq + 1)
+        SLOT.pack_into(self._buf, off, seq + 1, symbol.encode(), price, ts)
+        SEQ.pack_into(self._buf, off, seq + 2)
+
+    # -- readers (API workers) --
+
+    def _attach(self) -> bool:
+        if self._buf is not None:
+            return True
+        now = time.monotonic()
+        if not self.name or now < self._next_attach:
+            return False
+        self._next_attach = now + ATTACH_RETRY_SECONDS
+        try:
+            shm = _open(self.name, 0, create=False)
+        except FileNotFoundError:
+            return False
+        magic, version, slots = HEADER.unpack_from(shm.buf, 0)
+        if (magic, version) != (MAGIC, VERSION):
+            shm.close()
+            return False
+        self.slots = slots
+        self._map(shm)
+        return True
+
+    def read(self, symbol: str) -> Optional[tuple[int, float]]:
+        """(price ticks, epoch ts), or None if not on the board or too old."""
+        if not self._attach():
+            return None
+        slot = self._index.get(symbol)
+        if slot is None:
+            now = time.monotonic()
+            if now < self._next_rescan:
+                return None
+            self._next_rescan = now + ATTACH_RETRY_SECONDS
+            self._rescan()
+            slot = self._index.get(symbol)
+            if slot is None:
+                return None
+
+        fields = self._stable(slot)
+        if fields is None:
+            return None
+        _, _, price, ts = fields
+        if time.time() - ts > self.max_age:
+            return None  # engine stopped; let the caller go to the DB
+        return price, ts
+
+    def quote(self, symbol: str) -> Optional[tuple[int, datetime]]:
+        hit = self.read(symbol)
+        if hit is None:
+            return None
+        return hit[0], datetime.fromtimestamp(hit[1], timezone.utc)
+
+
+price_board = PriceBoard(
+    settings.PRICE_BOARD_NAME,
+    settings.PRICE_BOARD_SLOTS,
+    settings.PRICE_BOARD_MAX_AGE_SECONDS,
+)
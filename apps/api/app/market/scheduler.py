@@ -0,0 +1,138 @@
+"""
+Fixed-rate tick scheduler for the market engine.
+
+Tick n is due at start + n * period on the monotonic clock, so the time
+spent generating and writing a tick never stretches the period. When a tick
+runs so late that whole slots have passed, the overrun policy decides what
+happens to them:
+
+  skip      drop the missed slots and wait for the next one on the grid
+  catch_up  run every missed slot back to back until on schedule again
+  coalesce  run one tick now standing in for all missed slots
+
+Every tick carries its scheduled wall time (start wall time + n * period,
+evenly spaced by construction) alongside the actual one; the engine stamps
+ticks with the scheduled time and logs summary() of the recent history
+every MARKET_STATS_EVERY ticks.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional
+
+Policy = Literal["skip", "catch_up", "coalesce"]
+POLICIES: tuple[str, ...] = ("skip", "catch_up", "coalesce")
+
+
+@dataclass(frozen=True, slots=True)
+class TickRecord:
+    seq: int
+    scheduled: float  # epoch seconds
+    actual: float  # epoch seconds
+    missed: int  # slots skipped or coalesced right before this tick
+
+    @property
+    def lag(self) -> float:
+        return self.actual - self.scheduled
+
+
+class TickScheduler:
+    def __init__(
+        self,
+        period: float,
+        policy: Policy = "skip",
+        history: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        if period <= 0:
+            raise ValueError("period must be > 0")
+        if policy not in POLICIES:
+            raise ValueError(f"unknown overrun policy {policy!r} (expected one of {POLICIES})")
+        self.period = period
+        self.policy = policy
+        self.records: deque[TickRecord] = deque(maxlen=history)
+        self.missed = 0
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._start: Optional[float] = None
+        self._start_wall = 0.0
+        self._seq = -1
+
+    def start(self) -> None:
+        """Anchor the grid at now; tick 0 is due immediately."""
+        self._start = self._clock()
+        self._start_wall = self._wall_clock()
+        self._seq = -1
+
+    def _due(self, seq: int) -> float:
+        return self._start + seq * self.period
+
+    def _plan(self) -> tuple[int, float]:
+        """(seq of the next tick to run, seconds to wait for it)."""
+        if self._start is None:
+            self.start()
+        now = self._clock()
+        seq = self._seq + 1
+        late = now - self._due(seq)
+        if late >= self.period:
+            behind = int(late // self.period)  # later slots that are also already due
+            if self.policy == "skip":
+                seq += behind + 1
+            elif self.policy == "coalesce":
+                seq += behind
+        return seq, self._due(seq) - now
+
+    def _fire(self, seq: int) -> TickRecord:
+        missed = seq - self._seq - 1
+        self._seq = seq
+        self.missed += missed
+        record = TickRecord(
+            seq=seq,
+            scheduled=self._start_wall + seq * self.period,
+            # Derived from the monotonic clock so wall-clock steps don't show up as lag
+            actual=self._start_wall + (self._clock() - self._start),
+            missed=missed,
+        )
+        self.records.append(record)
+        return record
+
+    def wait(self) -> TickRecord:
+        """Block until the next tick is due."""
+        seq, delay = self._plan()
+        while delay > 0:
+            time.sleep(delay)
+            delay = self._due(seq) - self._clock()
+        return self._fire(seq)
+
+    async def wait_async(self) -> TickRecord:
+        """Like wait(), without blocking the event loop."""
+        seq, delay = self._plan()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._due(seq) - self._clock()
+        return self._fire(seq)
+
+    def stats(self) -> dict:
+        """Lag over the recorded history, in milliseconds."""
+        lags = sorted(r.lag for r in self.records)
+        if not lags:
+            return {"ticks": 0, "missed": self.missed}
+        return {
+            "ticks": len(lags),
+            "missed": self.missed,
+            "lag_ms_mean": 1000 * sum(lags) / len(lags),
+            "lag_ms_p99": 1000 * lags[min(len(lags) - 1, int(0.99 * len(lags)))],
+            "lag_ms_max": 1000 * lags[-1],
+        }
+
+    def summary(self) -> str:
+        """stats() as one log line."""
+        st = self.stats()
+        if not st["ticks"]:
+            return f"no ticks yet, missed={st['missed']}"
+        return (
+            f"last {st['ticks']} ticks: lag mean={st['lag_ms_mean']:.1f}ms "
+            f"p99={st['lag_ms_p99']:.1f}ms max={st['lag_ms_max']:.1f}ms, {st['missed']} missed since start"
+        )
@@ -0,0 +1,173 @@
+"""
+Per-symbol ring buffers of recent ticks, kept in each API worker.
+
+Prices and timestamps live in flat `array('d')` buffers (8 bytes per value,
+no per-tick Python objects). The store is filled from `market_ticks` when the
+notify listener connects and then follows the engine's `market_tick`
+notifications by reading only rows with a higher id than it has seen.
+That relies on a single tick writer, which is what the engine is.
+"""
+import threading
+from array import array
+from typing import Optional
+
+from sqlalchemy import select, true
+from sqlalchemy.orm import Session
+
+from app.core import notify
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.models.market_price import MarketPrice
+from app.models.market_tick import MarketTick
+
+CHANNEL = "market_tick"
+
+
+class TickRing:
+    __slots__ = ("capacity", "prices", "ts", "head", "count", "total", "complete")
+
+    def __init__(self, capacity: int, complete: bool = False) -> None:
+        self.capacity = capacity
+        self.prices = array("d", bytes(8 * capacity))
+        self.ts = array("d", bytes(8 * capacity))
+        self.head = 0  # next slot to write
+        self.count = 0
+        self.total = 0  # appends ever, for incremental readers
+        # True while the ring still holds the symbol's entire history
+        self.complete = complete
+
+    def append(self, ts: float, price: float) -> None:
+        self.prices[self.head] = price
+        self.ts[self.head] = ts
+        self.head = (self.head + 1) % self.capacity
+        self.total += 1
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.complete = False
+
+    def _span(self, n: int) -> tuple[int, int]:
+        start = (self.head - n) % self.capacity
+        return start, start + n
+
+    def latest(self, n: int) -> Optional[list[float]]:
+        """Last n prices oldest -> newest, or None if the ring can't answer."""
+        if n < 0 or (n > self.count and not self.complete):
+            return None
+        n = min(n, self.count)
+        if n == 0:
+            return []
+        start, end = self._span(n)
+        if end <= self.capacity:
+            return self.prices[start:end].tolist()
+        return self.prices[start:].tolist() + self.prices[: end - self.capacity].tolist()
+
+
+class TickStore:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._rings: dict[str, TickRing] = {}
+        self._lock = threading.Lock()
+        self._filled = False
+        self.last_id = 0
+        # Bumped on every change; lets derived caches (app.services.risk) skip refreshes
+        self.seq = 0
+        # Bumped when the rings are replaced wholesale (fill); derived caches start over
+        self.generation = 0
+
+    def _ring(self, symbol: str) -> TickRing:
+        ring = self._rings.get(symbol)
+        if ring is None:
+            # A symbol first seen after the fill has no older ticks in the DB
+            ring = self._rings[symbol] = TickRing(self.capacity, complete=self._filled)
+        return ring
+
+    def fill(self, db: Session) -> None:
+        recent = (
+            select(MarketTick.id, MarketTick.symbol, MarketTick.price, MarketTick.ts)
+            .where(MarketTick.symbol == MarketPrice.symbol)
+            .order_by(MarketTick.ts.desc(), MarketTick.id.desc())
+            .limit(self.capacity)
+            .lateral()
+        )
+        rows = db.execute(
+            select(recent.c.id, recent.c.symbol, recent.c.price, recent.c.ts)
+            .select_from(MarketPrice)
+            .join(recent, true())
+            .order_by(recent.c.symbol, recent.c.ts, recent.c.id)
+        ).all()
+
+        rings: dict[str, TickRing] = {}
+        last_id = 0
+        for tick_id, symbol, price, ts in rows:
+            ring = rings.get(symbol)
+            if ring is None:
+                ring = rings[symbol] = TickRing(self.capacity)
+            ring.append(ts.timestamp(), float(price))
+            last_id = max(last_id, tick_id)
+        for ring in rings.values():
+            ring.complete = ring.count < self.capacity
+
+        with self._lock:
+            self._rings = rings
+            self.last_id = last_id
+            self._filled = True
+            self.generation += 1
+            self.seq += 1
+
+    def catch_up(self, db: Session) -> None:
+        rows = db.execute(
+            select(MarketTick.id, MarketTick.symbol, MarketTick.price, MarketTick.ts)
+            .where(MarketTick.id > self.last_id)
+            .order_by(MarketTick.id)
+        ).all()
+        if not rows:
+            return
+        with self._lock:
+            for tick_id, symbol, price, ts in rows:
+                self._ring(symbol).append(ts.timestamp(), float(price))
+                self.last_id = max(self.last_id, tick_id)
+            self.seq += 1
+
+    def append(self, symbol: str, ts: float, price: float) -> None:
+        with self._lock:
+            self._ring(symbol).append(ts, price)
+            self.seq += 1
+
+    def history(self, symbol: str, limit: int) -> Optional[list[float]]:
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is None:
+                return None
+            return ring.latest(limit)
+
+    def updates(self, seen: dict[str, int]) -> tuple[int, int, dict[str, tuple[int, list[float]]]]:
+        """
+        (generation, seq, {symbol: (total, prices)}) for symbols that got ticks
+        since a reader saw `seen[symbol]` of them. `prices` are the new ones,
+        preceded by the last one already seen while the ring still has it.
+        """
+        with self._lock:
+            out = {}
+            for symbol, ring in self._rings.items():
+                new = ring.total - seen.get(symbol, 0)
+                if new > 0:
+                    out[symbol] = (ring.total, ring.latest(min(new + 1, ring.count)))
+            return self.generation, self.seq, out
+
+    def on_notify(self, payload: str) -> None:
+        db = ReadSessionLocal()
+        try:
+            # Empty payload = listener (re)connected; ticks may have been missed
+            if payload == "" or not self._filled:
+                self.fill(db)
+            else:
+                self.catch_up(db)
+        finally:
+            db.close()
+
+    def listen(self) -> None:
+        notify.subscribe(CHANNEL, self.on_notify)
+
+
+tick_store = TickStore(settings.TICK_BUFFER_SIZE)
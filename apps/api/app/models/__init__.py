@@ -4,3 +4,5 @@ from .order import Order
 from .position import Position
 from .market_price import MarketPrice
 from .market_tick import MarketTick
+from .instrument import Instrument
+from .daily_statement import DailyStatement
@@ -18,6 +18,13 @@ class Account(Base):
         nullable=False,
         default=10000.00,
     )
+    # Book value (cash + cost basis) the account was opened with: the
+    # baseline for its first end-of-day statement's realized P&L
+    opening_balance: Mapped[float] = mapped_column(
+        Numeric(16, 4),
+        nullable=False,
+        default=10000.00,
+    )
 
     created_at: Mapped["DateTime"] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,35 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DailyStatement(Base):
+    """End-of-day mark-to-market per user, written by app.cli.eod."""
+
+    __tablename__ = "daily_statements"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    cash: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    positions_value: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+    equity: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+    unrealized_pnl: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+    realized_pnl: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+
+    trades: Mapped[int] = mapped_column(Integer, nullable=False)
+    bought: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+    sold: Mapped[Decimal] = mapped_column(Numeric(16, 4), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,32 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Boolean, String, DateTime, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Instrument(Base):
+    __tablename__ = "instruments"
+
+    symbol: Mapped[str] = mapped_column(String(16), primary_key=True)
+    start_price: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    volatility: Mapped[Decimal] = mapped_column(
+        Numeric(8, 6),
+        nullable=False,
+        default=Decimal("0.0020"),
+    )
+    tick_size: Mapped[Decimal] = mapped_column(
+        Numeric(12, 4),
+        nullable=False,
+        default=Decimal("0.0001"),
+    )
+    active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import String, DateTime, Numeric, func
+from sqlalchemy import Index, String, DateTime, Numeric, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -11,8 +11,12 @@ class MarketTick(Base):
     __tablename__ = "market_ticks"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    symbol: Mapped[str] = mapped_column(String(16), index=True, nullable=False)
+    symbol: Mapped[str] = mapped_column(String(16), nullable=False)
     price: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
     ts: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+    __table_args__ = (
+        Index("ix_market_ticks_symbol_ts", "symbol", "ts"),
+    )
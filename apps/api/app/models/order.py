@@ -29,5 +29,6 @@ class Order(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
+        index=True,  # day slices for the end-of-day batch
         nullable=False,
     )
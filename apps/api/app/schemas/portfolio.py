@@ -20,3 +20,27 @@ class PortfolioSummary(BaseModel):
     positions_value: float
     unrealized_pnl: float
     positions: List[PositionWithQuote]
+
+
+class RiskPosition(BaseModel):
+    symbol: str
+    exposure: float
+    weight: float
+    volatility: float
+    contribution: float
+    contribution_pct: float
+
+
+class RiskSummary(BaseModel):
+    # Per tick, in account currency; var/cvar are positive losses
+    equity: float
+    observations: int
+    # Most returns the tick buffers hold per symbol: the cap on `window`
+    max_window: int
+    confidence: float
+    volatility: float
+    var: float
+    cvar: float
+    positions: List[RiskPosition]
+    symbols: List[str]
+    correlation: List[List[float]]
@@ -0,0 +1,39 @@
+"""
+Cash/position accounting rules for a single fill.
+
+Pure functions over fixed-point ints (price ticks and cents, see
+app.core.money) so the live order path (routes/trading.py) and the
+backtester apply exactly the same rounding and rejection rules.
+"""
+from decimal import Decimal
+
+from app.core.money import TICKS_PER_CENT, div_half_up, notional_cents
+
+# Cash every new account starts with
+STARTING_CASH = Decimal("10000.00")
+
+
+class OrderRejected(Exception):
+    def __init__(self, detail: str) -> None:
+        super().__init__(detail)
+        self.detail = detail
+
+
+def apply_buy(cash: int, held: int, avg_price: int, price: int, qty: int) -> tuple[int, int, int]:
+    """Return (cash cents, held, avg_price ticks) after buying qty at price ticks."""
+    cost = notional_cents(price, qty)
+    if cash < cost:
+        raise OrderRejected("Insufficient cash")
+
+    if held == 0:
+        new_avg = price
+    else:
+        new_avg = div_half_up(avg_price * held + cost * TICKS_PER_CENT, held + qty)
+    return cash - cost, held + qty, new_avg
+
+
+def apply_sell(cash: int, held: int, avg_price: int, price: int, qty: int) -> tuple[int, int, int]:
+    """Return (cash cents, held, avg_price ticks) after selling qty at price ticks."""
+    if held < qty:
+        raise OrderRejected(f"Insufficient shares (have {held}, tried to sell {qty})")
+    return cash + notional_cents(price, qty), held - qty, avg_price
@@ -0,0 +1,168 @@
+"""
+End-of-day mark-to-market into `daily_statements`.
+
+Work is split into user-id ranges; each range is one set-based statement
+that marks positions to the closing prices, joins the day's filled orders
+and upserts one row per account, so a rerun simply overwrites the day.
+
+Realized P&L needs no trade-by-trade replay: cash + cost basis only moves
+when a sell realizes a gain or loss, so the day's realized P&L is its change
+since the previous statement (or since the account's opening_balance for a
+first statement, which therefore covers the account's whole history).
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, select, text, true
+from sqlalchemy.orm import Session
+
+from app.core.money import float_to_ticks, ticks_to_decimal
+from app.market.archive import tick_archive
+from app.models.account import Account
+from app.models.market_price import MarketPrice
+from app.models.market_tick import MarketTick
+from app.models.position import Position
+
+STATEMENT_SQL = text("""
+WITH closes AS (
+    SELECT * FROM unnest(CAST(:symbols AS varchar[]), CAST(:prices AS numeric[])) AS c(symbol, price)
+), pos AS (
+    SELECT p.user_id,
+           sum(p.qty * c.price) AS positions_value,
+           sum(p.qty * p.avg_price) AS cost_basis
+    FROM positions p
+    JOIN closes c ON c.symbol = p.symbol
+    WHERE p.user_id >= :lo AND p.user_id < :hi
+    GROUP BY p.user_id
+), trades AS (
+    SELECT o.user_id,
+           count(*) AS trades,
+           coalesce(sum(o.qty * o.filled_price) FILTER (WHERE o.side = 'buy'), 0) AS bought,
+           coalesce(sum(o.qty * o.filled_price) FILTER (WHERE o.side = 'sell'), 0) AS sold
+    FROM orders o
+    WHERE o.created_at >= :day_start AND o.created_at < :day_end
+      AND o.user_id >= :lo AND o.user_id < :hi
+      AND o.status = 'filled'
+    GROUP BY o.user_id
+), prev AS (
+    SELECT DISTINCT ON (s.user_id) s.user_id, s.equity - s.unrealized_pnl AS book
+    FROM daily_statements s
+    WHERE s.user_id >= :lo AND s.user_id < :hi AND s.day < :day
+    ORDER BY s.user_id, s.day DESC
+)
+INSERT INTO daily_statements AS d
+    (user_id, day, cash, positions_value, equity, unrealized_pnl, realized_pnl, trades, bought, sold)
+SELECT a.user_id,
+       :day,
+       a.cash_balance,
+       coalesce(pos.positions_value, 0),
+       a.cash_balance + coalesce(pos.positions_value, 0),
+       coalesce(pos.positions_value - pos.cost_basis, 0),
+       a.cash_balance + coalesce(pos.cost_basis, 0) - coalesce(prev.book, a.opening_balance),
+       coalesce(t.trades, 0),
+       coalesce(t.bought, 0),
+       coalesce(t.sold, 0)
+FROM accounts a
+LEFT JOIN pos ON pos.user_id = a.user_id
+LEFT JOIN trades t ON t.user_id = a.user_id
+LEFT JOIN prev ON prev.user_id = a.user_id
+WHERE a.user_id >= :lo AND a.user_id < :hi
+ON CONFLICT (user_id, day) DO UPDATE SET
+    cash = EXCLUDED.cash,
+    positions_value = EXCLUDED.positions_value,
+    equity = EXCLUDED.equity,
+    unrealized_pnl = EXCLUDED.unrealized_pnl,
+    realized_pnl = EXCLUDED.realized_pnl,
+    trades = EXCLUDED.trades,
+    bought = EXCLUDED.bought,
+    sold = EXCLUDED.sold,
+    created_at = now()
+""")
+
+
+@dataclass(frozen=True)
+class EodJob:
+    day: date
+    closes: dict[str, Decimal]
+
+    @property
+    def day_start(self) -> datetime:
+        return datetime.combine(self.day, time.min, timezone.utc)
+
+    @property
+    def day_end(self) -> datetime:
+        return self.day_start + timedelta(days=1)
+
+
+class MissingCloses(LookupError):
+    pass
+
+
+def _last_ticks(db: Session, day_end: datetime) -> dict[str, Decimal]:
+    last = (
+        select(MarketTick.price)
+        .where(MarketTick.symbol == MarketPrice.symbol, MarketTick.ts < day_end)
+        .order_by(MarketTick.ts.desc(), MarketTick.id.desc())
+        .limit(1)
+        .lateral()
+    )
+    return dict(
+        db.execute(select(MarketPrice.symbol, last.c.price).join(last, true())).all()
+    )
+
+
+def closing_prices(db: Session, day: date) -> dict[str, Decimal]:
+    """
+    Close per symbol: the live market_prices when run for the current UTC
+    day, otherwise the last tick before that day ended (carried forward from
+    earlier days), looked up in the tick archive for archived days.
+
+    Raises MissingCloses if a symbol someone holds has no close, rather than
+    valuing the position at zero.
+    """
+    if day >= datetime.now(timezone.utc).date():
+        closes = dict(db.execute(select(MarketPrice.symbol, MarketPrice.price)).all())
+    else:
+        day_end = datetime.combine(day + timedelta(days=1), time.min, timezone.utc)
+        closes = _last_ticks(db, day_end)
+        for symbol in db.scalars(select(MarketPrice.symbol)).all():
+            boundary = tick_archive.archived_until(symbol)
+            # Days before the boundary are archived; the hot table may also
+            # have nothing between the boundary and day_end.
+            if boundary is not None and (day_end <= boundary or symbol not in closes):
+                last = tick_archive.tail(symbol, 1, until=day_end)
+                if len(last):
+                    closes[symbol] = ticks_to_decimal(float_to_ticks(float(last[-1])))
+
+    held = select(Position.symbol).where(Position.qty != 0).distinct()
+    missing = db.scalars(held.where(Position.symbol.not_in(list(closes)))).all()
+    if missing:
+        raise MissingCloses(f"no closing price for {day}: {', '.join(sorted(missing))}")
+    return closes
+
+
+def user_ranges(db: Session, chunk: int) -> list[tuple[int, int]]:
+    """Half-open [lo, hi) user-id ranges covering every account."""
+    lo, hi = db.execute(select(func.min(Account.user_id), func.max(Account.user_id))).one()
+    if lo is None:
+        return []
+    return [(start, min(start + chunk, hi + 1)) for start in range(lo, hi + 1, chunk)]
+
+
+def run_range(db: Session, job: EodJob, lo: int, hi: int) -> int:
+    """Write statements for accounts with lo <= user_id < hi; returns rows written."""
+    result = db.execute(
+        STATEMENT_SQL,
+        {
+            "symbols": list(job.closes),
+            "prices": list(job.closes.values()),
+            "lo": lo,
+            "hi": hi,
+            "day": job.day,
+            "day_start": job.day_start,
+            "day_end": job.day_end,
+        },
+    )
+    db.commit()
+    return result.rowcount
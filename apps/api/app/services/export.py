@@ -0,0 +1,251 @@
+"""
+Streaming exports of market_ticks and orders.
+
+Each exporter is a generator that opens its own session (the request's
+session is closed before a StreamingResponse body runs), reads through a
+server-side cursor in `chunk_rows` partitions and yields encoded bytes per
+partition, so memory stays flat regardless of how many rows are exported.
+Arrow IPC and Parquet need pyarrow, which is optional.
+
+Tick exports also cover days moved to the tick archive (app.market.archive):
+archived rows come first, with an empty id, and the SQL is clipped at each
+symbol's archive boundary, the same split load_ticks uses.
+"""
+import csv
+import io
+import itertools
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Literal, Optional, Sequence
+
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.money import float_to_ticks, ticks_to_decimal
+from app.market.archive import tick_archive
+from app.models.market_tick import MarketTick
+from app.models.order import Order
+
+ExportFormat = Literal["csv", "arrow", "parquet"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CHUNK_ROWS = 50_000
+
+TICK_COLUMNS = ("id", "symbol", "ts", "price")
+ORDER_COLUMNS = ("id", "user_id", "symbol", "side", "qty", "status", "filled_price", "created_at")
+
+
+Partitions = Iterable[Sequence[tuple]]
+
+
+class ExportUnavailable(Exception):
+    pass
+
+
+def _archive_boundaries(symbol: Optional[str], since: Optional[datetime]) -> dict[str, datetime]:
+    """symbol -> archive boundary, for the symbols whose range reaches into the archive."""
+    symbols = [symbol.upper()] if symbol else tick_archive.symbols()
+    out = {}
+    for s in symbols:
+        boundary = tick_archive.split(s, since)
+        if boundary is not None:
+            out[s] = boundary
+    return out
+
+
+def tick_query(
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Select:
+    """market_ticks rows in range that are not covered by archived_ticks()."""
+    stmt = select(MarketTick.id, MarketTick.symbol, MarketTick.ts, MarketTick.price)
+    if symbol:
+        stmt = stmt.where(MarketTick.symbol == symbol.upper()).order_by(MarketTick.ts, MarketTick.id)
+    else:
+        stmt = stmt.order_by(MarketTick.id)
+    boundaries = _archive_boundaries(symbol, since)
+    if boundaries:
+        stmt = stmt.where(
+            or_(
+                MarketTick.symbol.not_in(list(boundaries)),
+                *(and_(MarketTick.symbol == s, MarketTick.ts >= b) for s, b in boundaries.items()),
+            )
+        )
+    if since is not None:
+        stmt = stmt.where(MarketTick.ts >= since)
+    if until is not None:
+        stmt = stmt.where(MarketTick.ts < until)
+    return stmt
+
+
+def archived_ticks(
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[list[tuple]]:
+    """Archived ticks in range as TICK_COLUMNS rows (id None), one symbol and day at a time."""
+    for s in _archive_boundaries(symbol, since):
+        for ts, price in tick_archive.segments(s, since, until):
+            for i in range(0, len(ts), chunk_rows):
+                yield [
+                    (None, s, datetime.fromtimestamp(t, timezone.utc), ticks_to_decimal(float_to_ticks(p)))
+                    for t, p in zip(ts[i:i + chunk_rows].tolist(), price[i:i + chunk_rows].tolist())
+                ]
+
+
+def order_query(
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Select:
+    stmt = select(
+        Order.id,
+        Order.user_id,
+        Order.symbol,
+        Order.side,
+        Order.qty,
+        Order.status,
+        Order.filled_price,
+        Order.created_at,
+    ).order_by(Order.id)
+    if user_id is not None:
+        stmt = stmt.where(Order.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(Order.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Order.created_at < until)
+    return stmt
+
+
+def _partitions(session_factory: Callable[[], Session], stmt: Select, chunk_rows: int):
+    db = session_factory()
+    try:
+        # yield_per turns on stream_results -> a server-side cursor on psycopg
+        result = db.execute(stmt.execution_options(yield_per=chunk_rows))
+        yield from result.partitions()
+    finally:
+        db.close()
+
+
+def iter_csv(
+    session_factory: Callable[[], Session],
+    stmt: Select,
+    columns: tuple[str, ...],
+    chunk_rows: int = CHUNK_ROWS,
+    head: Partitions = (),
+) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for rows in itertools.chain(head, _partitions(session_factory, stmt, chunk_rows)):
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportUnavailable("pyarrow is required for arrow/parquet exports") from e
+    return pa, pq
+
+
+class _ChunkSink(io.RawIOBase):
+    """Append-only byte sink drained after every batch."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(pa, columns: tuple[str, ...]):
+    types = {
+        "id": pa.int64(),
+        "user_id": pa.int64(),
+        "qty": pa.int64(),
+        "symbol": pa.string(),
+        "side": pa.string(),
+        "status": pa.string(),
+        "price": pa.float64(),
+        "filled_price": pa.float64(),
+        "ts": pa.timestamp("us", tz="UTC"),
+        "created_at": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(c, types[c]) for c in columns])
+
+
+def iter_arrow(
+    session_factory: Callable[[], Session],
+    stmt: Select,
+    columns: tuple[str, ...],
+    fmt: ExportFormat = "arrow",
+    chunk_rows: int = CHUNK_ROWS,
+    head: Partitions = (),
+) -> Iterator[bytes]:
+    pa, pq = _pyarrow()
+    schema = _arrow_schema(pa, columns)
+    numeric = {i for i, c in enumerate(columns) if c in ("price", "filled_price")}
+
+    sink = _ChunkSink()
+    out = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(out, schema)
+        write = writer.write_table
+        wrap = pa.Table.from_batches
+    else:
+        writer = pa.ipc.new_stream(out, schema)
+        write = writer.write_batch
+        wrap = lambda batches: batches[0]  # noqa: E731
+
+    for rows in itertools.chain(head, _partitions(session_factory, stmt, chunk_rows)):
+        cols = list(zip(*rows))
+        arrays = [
+            pa.array(
+                [None if v is None else float(v) for v in col] if i in numeric else col,
+                type=schema.field(i).type,
+            )
+            for i, col in enumerate(cols)
+        ]
+        write(wrap([pa.RecordBatch.from_arrays(arrays, schema=schema)]))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(
+    session_factory: Callable[[], Session],
+    stmt: Select,
+    columns: tuple[str, ...],
+    fmt: ExportFormat,
+    chunk_rows: int = CHUNK_ROWS,
+    head: Partitions = (),
+) -> Iterator[bytes]:
+    """`head` partitions (e.g. archived_ticks()) are written before the rows of `stmt`."""
+    if fmt == "csv":
+        return iter_csv(session_factory, stmt, columns, chunk_rows, head)
+    _pyarrow()  # fail before the response starts, not halfway through the body
+    return iter_arrow(session_factory, stmt, columns, fmt, chunk_rows, head)
@@ -0,0 +1,82 @@
+"""
+In-memory instrument registry shared by the market engine and the API.
+
+Loaded from the `instruments` table and swapped wholesale on reload, so
+readers never see a half-built map and lookups stay O(1) without locking.
+A statement-level trigger on `instruments` sends `instruments_changed`,
+which makes every process hot-reload via app.core.notify.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import notify
+from app.core.money import to_ticks
+from app.core.database import SessionLocal
+from app.models.instrument import Instrument
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "instruments_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class InstrumentSpec:
+    symbol: str
+    start_price: int  # ticks
+    volatility: float
+    tick_size: int  # ticks
+    active: bool
+
+
+class InstrumentRegistry:
+    def __init__(self) -> None:
+        self._by_symbol: dict[str, InstrumentSpec] = {}
+        self._active: frozenset[str] = frozenset()
+
+    def load(self, db: Session) -> None:
+        rows = db.scalars(select(Instrument)).all()
+        by_symbol = {
+            r.symbol: InstrumentSpec(
+                symbol=r.symbol,
+                start_price=to_ticks(r.start_price),
+                volatility=float(r.volatility),
+                tick_size=max(1, to_ticks(r.tick_size)),
+                active=bool(r.active),
+            )
+            for r in rows
+        }
+        active = frozenset(s for s, spec in by_symbol.items() if spec.active)
+        # Two plain attribute stores; readers tolerate seeing one before the other.
+        self._by_symbol = by_symbol
+        self._active = active
+        logger.info("instrument registry loaded: %d instruments (%d active)", len(by_symbol), len(active))
+
+    def reload(self, _payload: str = "") -> None:
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+
+    def listen(self) -> None:
+        notify.subscribe(CHANNEL, self.reload)
+
+    def get(self, symbol: str) -> Optional[InstrumentSpec]:
+        return self._by_symbol.get(symbol)
+
+    def is_active(self, symbol: str) -> bool:
+        return symbol in self._active
+
+    def active(self) -> list[InstrumentSpec]:
+        by_symbol = self._by_symbol
+        return [by_symbol[s] for s in self._active if s in by_symbol]
+
+    def symbols(self) -> list[str]:
+        return sorted(self._active)
+
+
+instruments = InstrumentRegistry()
@@ -0,0 +1,97 @@
+"""
+Market order execution against the caller's session.
+
+Shared by POST /trading/orders (one transaction per order) and the
+group-commit sequencer (many orders per transaction). Neither commits here:
+execute_order only reads, mutates and flushes, and the caller decides when
+the work becomes durable.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.money import cents_to_decimal, ticks_to_decimal, ticks_to_float, to_cents, to_ticks
+from app.models.account import Account
+from app.models.order import Order
+from app.models.position import Position
+from app.schemas.trading import OrderOut
+from app.services.accounting import OrderRejected, apply_buy, apply_sell
+from app.services.quotes import get_quote
+
+
+class AccountNotFound(LookupError):
+    pass
+
+
+def execute_order(db: Session, uid: int, symbol: str, side: str, qty: int) -> OrderOut:
+    """
+    Fill a validated market order at the current quote.
+
+    Raises ValueError if the symbol has no quote yet and AccountNotFound if
+    the user has no account. On OrderRejected the rejected order row has
+    already been added to the session and should still be committed.
+    """
+    # Fixed-point money math: price in ticks, cash in cents (app.core.money)
+    price = get_quote(db, symbol, board=False)
+
+    account = db.scalar(select(Account).where(Account.user_id == uid))
+    if not account:
+        raise AccountNotFound("Account not found")
+
+    position = db.scalar(
+        select(Position).where(Position.user_id == uid, Position.symbol == symbol)
+    )
+
+    held = int(position.qty) if position is not None else 0
+    avg = to_ticks(position.avg_price) if position is not None else 0
+    apply = apply_buy if side == "buy" else apply_sell
+
+    try:
+        cash, held, avg = apply(to_cents(account.cash_balance), held, avg, price, qty)
+    except OrderRejected:
+        db.add(
+            Order(
+                user_id=uid,
+                symbol=symbol,
+                side=side,
+                qty=qty,
+                status="rejected",
+                filled_price=None,
+            )
+        )
+        raise
+
+    account.cash_balance = cents_to_decimal(cash)
+
+    if position is None:
+        position = Position(
+            user_id=uid,
+            symbol=symbol,
+            qty=held,
+            avg_price=ticks_to_decimal(avg),
+        )
+        db.add(position)
+    elif held == 0:
+        db.delete(position)
+    else:
+        position.qty = held
+        position.avg_price = ticks_to_decimal(avg)
+
+    order = Order(
+        user_id=uid,
+        symbol=symbol,
+        side=side,
+        qty=qty,
+        status="filled",
+        filled_price=ticks_to_decimal(price),
+    )
+    db.add(order)
+    db.flush()
+
+    return OrderOut(
+        id=order.id,  # read before commit expires it, saves a refresh
+        symbol=symbol,
+        side=side,
+        qty=qty,
+        status="filled",
+        filled_price=ticks_to_float(price),
+    )
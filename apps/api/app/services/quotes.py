@@ -1,10 +1,63 @@
-from decimal import Decimal
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+
+from app.core.money import to_ticks
+from app.market.priceboard import price_board
 from app.models.market_price import MarketPrice
 
-def get_quote(db: Session, symbol: str) -> Decimal:
+# Latest prices (in ticks) published in-process by the embedded market engine.
+# Empty when the engine runs as its own process; then the shared-memory price
+# board is next, and the DB is the last resort.
+_live: dict[str, tuple[int, datetime]] = {}
+
+
+def publish(symbol: str, price: int, ts: datetime) -> None:
+    _live[symbol] = (price, ts)
+
+
+def live_quote(symbol: str) -> Optional[tuple[int, datetime]]:
+    """Latest price without touching the DB, if this process can see one."""
+    live = _live.get(symbol)
+    if live is not None:
+        return live
+    return price_board.quote(symbol)
+
+
+def get_quote(db: Session, symbol: str, board: bool = True) -> int:
+    """
+    Latest price in ticks. Order fills pass board=False so they price from
+    market_prices (or the in-process engine), never from a shared-memory copy.
+    """
     symbol = symbol.upper()
+    live = _live.get(symbol)
+    if live is not None:
+        return live[0]
+    if board:
+        hit = price_board.read(symbol)
+        if hit is not None:
+            return hit[0]
     mp = db.get(MarketPrice, symbol)
     if not mp:
         raise ValueError(f"Unknown symbol: {symbol}")
-    return Decimal(mp.price)
\ No newline at end of file
+    return to_ticks(mp.price)
+
+
+def get_quotes(db: Session, symbols: list[str]) -> dict[str, int]:
+    """Latest price in ticks per symbol in one query; unknown symbols are left out."""
+    out: dict[str, int] = {}
+    missing = []
+    for symbol in {s.upper() for s in symbols}:
+        live = _live.get(symbol) or price_board.read(symbol)
+        if live is not None:
+            out[symbol] = live[0]
+        else:
+            missing.append(symbol)
+    if missing:
+        rows = db.execute(
+            select(MarketPrice.symbol, MarketPrice.price).where(MarketPrice.symbol.in_(missing))
+        ).all()
+        out.update((s, to_ticks(p)) for s, p in rows)
+    return out
@@ -0,0 +1,185 @@
+"""
+Portfolio risk from recent tick returns.
+
+Each worker keeps one rolling returns matrix (window x symbols) fed from the
+tick ring buffers. It is refreshed at most once per TickStore.seq change and
+only with the ticks that arrived since the last refresh: every column is its
+own ring of returns, so a refresh writes the new rows and nothing else. A
+request copies out just the columns it holds, newest rows aligned, and runs
+a handful of NumPy reductions: no SQL for history, no Python loop over ticks.
+
+All figures are per tick and in account currency; returns are simple
+returns, so position P&L is exposure * return.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.market.tickbuffer import TickStore, tick_store
+
+
+@dataclass(frozen=True)
+class ReturnsMatrix:
+    seq: int
+    symbols: list[str]
+    returns: np.ndarray  # (window, symbols) oldest -> newest; NaN where a symbol has less history
+
+
+class ReturnsCache:
+    def __init__(self, store: TickStore) -> None:
+        self._store = store
+        self._lock = threading.Lock()
+        self.window = max(0, store.capacity - 1)
+        self._reset(-1)
+
+    def _reset(self, generation: int) -> None:
+        self._generation = generation
+        self._seq = -1
+        self._seen: dict[str, int] = {}
+        self._column: dict[str, int] = {}
+        self._returns = np.full((self.window, 16), np.nan)
+        self._head = np.zeros(16, np.intp)  # next row to write, per column
+
+    def _add_column(self, symbol: str) -> int:
+        k = self._column[symbol] = len(self._column)
+        if k == self._returns.shape[1]:
+            grow = self._returns.shape[1]
+            self._returns = np.hstack([self._returns, np.full((self.window, grow), np.nan)])
+            self._head = np.concatenate([self._head, np.zeros(grow, np.intp)])
+        return k
+
+    def _refresh(self) -> None:
+        if self._seq == self._store.seq:
+            return
+        generation, seq, updates = self._store.updates(self._seen)
+        if generation != self._generation:
+            self._reset(generation)
+            generation, seq, updates = self._store.updates(self._seen)
+            self._generation = generation
+
+        cols: list[int] = []
+        lens: list[int] = []
+        lapped: list[int] = []
+        flat: list[float] = []
+        for symbol, (total, prices) in updates.items():
+            k = self._column.get(symbol)
+            if k is None:
+                k = self._add_column(symbol)
+            if len(prices) != total - self._seen.get(symbol, 0) + 1:
+                lapped.append(k)  # no overlap with what we had: new symbol, or the ring lapped us
+            self._seen[symbol] = total
+            cols.append(k)
+            lens.append(len(prices))
+            flat.extend(prices)
+        if lapped:
+            self._returns[:, lapped] = np.nan
+            self._head[lapped] = 0
+        if flat and self.window:
+            self._append(np.array(cols, np.intp), np.array(lens, np.intp), np.array(flat))
+        self._seq = seq
+
+    def _append(self, cols: np.ndarray, lens: np.ndarray, prices: np.ndarray) -> None:
+        """Write the returns of each column's run of `prices` in one go."""
+        counts = np.maximum(lens - 1, 0)
+        n = int(counts.sum())
+        if n == 0:
+            return
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        rank = np.arange(n) - first  # position of each return within its column's run
+        at = np.repeat(np.cumsum(lens) - lens, counts) + rank
+        r = prices[at + 1] / prices[at] - 1.0
+
+        # Only the newest `window` returns of each run survive anyway
+        skip = np.repeat(np.maximum(counts - self.window, 0), counts)
+        keep = rank >= skip
+        col = np.repeat(cols, counts)[keep]
+        rows = (self._head[col] + (rank - skip)[keep]) % self.window
+        self._returns[rows, col] = r[keep]
+        self._head[cols] = (self._head[cols] + np.minimum(counts, self.window)) % self.window
+
+    def select(self, symbols: list[str], window: Optional[int] = None) -> ReturnsMatrix:
+        """The last `window` returns of the known `symbols`, as a copy."""
+        with self._lock:
+            self._refresh()
+            symbols = [s for s in symbols if s in self._column]
+            n = self.window if window is None else min(window, self.window)
+            cols = np.array([self._column[s] for s in symbols], np.intp)
+            if not len(cols) or n <= 0:
+                return ReturnsMatrix(self._seq, symbols, np.empty((max(n, 0), len(cols))))
+            rows = (self._head[cols] + np.arange(self.window - n, self.window)[:, None]) % self.window
+            return ReturnsMatrix(self._seq, symbols, self._returns[rows, cols])
+
+
+returns_cache = ReturnsCache(tick_store)
+
+
+def portfolio_risk(
+    exposures: dict[str, float],
+    confidence: float = 0.95,
+    window: Optional[int] = None,
+    cache: Optional[ReturnsCache] = None,
+) -> dict:
+    """
+    Volatility, historical VaR/CVaR, per-position risk contribution and
+    correlation for a portfolio given as symbol -> market value.
+    """
+    matrix = (cache or returns_cache).select(sorted(s for s, v in exposures.items() if v != 0), window)
+    held = matrix.symbols
+    empty = {
+        "observations": 0,
+        "confidence": confidence,
+        "volatility": 0.0,
+        "var": 0.0,
+        "cvar": 0.0,
+        "positions": [],
+        "symbols": [],
+        "correlation": [],
+    }
+    if not held:
+        return empty
+
+    R = matrix.returns
+    R = R[~np.isnan(R).any(axis=1)]  # only ticks every held symbol has
+    if len(R) < 2:
+        return empty
+
+    v = np.array([exposures[s] for s in held])
+    pnl = R @ v
+    cov = np.atleast_2d(np.cov(R, rowvar=False))
+    sigma = float(np.sqrt(max(v @ cov @ v, 0.0)))
+
+    var = float(-np.quantile(pnl, 1.0 - confidence))
+    tail = pnl[pnl <= -var]
+    cvar = float(-tail.mean()) if len(tail) else var
+
+    marginal = cov @ v
+    contribution = v * marginal / sigma if sigma > 0 else np.zeros_like(v)
+    standalone = np.abs(v) * np.sqrt(np.diag(cov))
+    gross = np.abs(v).sum()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.atleast_2d(np.corrcoef(R, rowvar=False))
+    corr = np.nan_to_num(corr, nan=0.0)
+
+    return {
+        "observations": len(R),
+        "confidence": confidence,
+        "volatility": sigma,
+        "var": var,
+        "cvar": cvar,
+        "positions": [
+            {
+                "symbol": s,
+                "exposure": float(v[i]),
+                "weight": float(v[i] / gross) if gross else 0.0,
+                "volatility": float(standalone[i]),
+                "contribution": float(contribution[i]),
+                "contribution_pct": float(contribution[i] / sigma) if sigma > 0 else 0.0,
+            }
+            for i, s in enumerate(held)
+        ],
+        "symbols": held,
+        "correlation": corr.round(6).tolist(),
+    }
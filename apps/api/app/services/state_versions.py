@@ -0,0 +1,83 @@
+"""
+Per-user state versions backing ETags on the account endpoints.
+
+A user's positions, orders and cash only change when they trade, so
+place_order bumps an in-memory counter and the counter becomes the ETag.
+Other workers bump theirs from the `user_state` notification sent in the
+same transaction. The epoch is rotated whenever a worker may have missed
+notifications (listener reconnect, table overflow), which turns every
+outstanding ETag stale instead of risking a wrong 304.
+
+Epoch and counters are per worker process, so a tag only revalidates on
+the worker that issued it: 304s are reliable with a single uvicorn worker
+and hit-or-miss behind several. Sharing just the epoch would not fix that
+safely: a worker that starts (or restarts) later counts each user from 0
+and could match a tag another worker issued for an older state.
+"""
+import secrets
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app.core import notify
+from app.core.database import pin_to_primary
+
+CHANNEL = "user_state"
+MAX_USERS = 1_000_000
+
+_epoch = secrets.token_hex(4)
+_versions: dict[int, int] = {}
+
+
+def _rotate() -> None:
+    global _epoch
+    _versions.clear()
+    _epoch = secrets.token_hex(4)
+
+
+def bump(user_id: int) -> None:
+    if len(_versions) >= MAX_USERS and user_id not in _versions:
+        _rotate()
+    _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+def etag(user_id: int) -> str:
+    return f'"{_epoch}-{user_id}-{_versions.get(user_id, 0)}"'
+
+
+def notify_changed(db: Session, user_id: int) -> None:
+    """Tell every worker (on commit) that this user's state changed."""
+    notify.notify(db, CHANNEL, str(user_id))
+
+
+def on_notify(payload: str) -> None:
+    if not payload:
+        # (Re)connected: anything could have changed while we weren't listening
+        _rotate()
+        return
+    user_id = int(payload)
+    bump(user_id)
+    # The write happened in another worker; keep this user's reads fresh here too
+    pin_to_primary(user_id)
+
+
+def listen() -> None:
+    notify.subscribe(CHANNEL, on_notify)
+
+
+def not_modified(request: Request, response: Response, user_id: int) -> Optional[Response]:
+    """Return a 304 if the client's copy is current, else tag `response` and return None.
+
+    Tags are only recognised by the worker that issued them (see module doc).
+
+    Call before any DB access: reading the version first means a trade landing
+    mid-request can only make the next ETag newer, never hide the change.
+    """
+    tag = etag(user_id)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    sent = request.headers.get("if-none-match", "")
+    if sent and tag in (t.strip().removeprefix("W/") for t in sent.split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None